@@ -0,0 +1,88 @@
+"""Requests per second on an authenticated endpoint, with auth disabled, a session and an API token.
+
+Usage: python benchmarks/bench_auth.py [--requests N] [--legacy]
+
+--legacy also measures the old behaviour, where the admin password was
+re-hashed every time Flask-Login loaded the session user.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("USERNAME", "admin")
+os.environ.setdefault("PASSWORD", "benchmark-password")
+os.environ.setdefault("API_TOKEN_SECRET", "benchmark-token-secret")
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+from config import Config  # noqa: E402
+from dockpeek import create_app  # noqa: E402
+from dockpeek import auth  # noqa: E402
+from dockpeek.api_tokens import ApiTokenSigner  # noqa: E402
+
+ENDPOINT = "/log-stream-stats"
+
+
+class AuthConfig(Config):
+    DISABLE_AUTH = False
+
+
+class NoAuthConfig(Config):
+    DISABLE_AUTH = True
+
+
+def measure(app, requests, login=False, token=None):
+    client = app.test_client()
+    if token:
+        client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    if login:
+        response = client.post("/login", data={
+            "username": os.environ["USERNAME"],
+            "password": os.environ["PASSWORD"]
+        })
+        assert response.status_code == 302, "login failed"
+
+    client.get(ENDPOINT)
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(ENDPOINT)
+        assert response.status_code == 200, response.status_code
+    return requests / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--legacy", action="store_true")
+    args = parser.parse_args()
+
+    results = [
+        ("auth disabled", measure(create_app(NoAuthConfig), args.requests)),
+        ("auth enabled, session", measure(create_app(AuthConfig), args.requests, login=True)),
+        ("auth enabled, API token", measure(create_app(AuthConfig), args.requests,
+                                            token=ApiTokenSigner(os.environ["API_TOKEN_SECRET"]).issue("bench", ["read"]))),
+    ]
+
+    if args.legacy:
+        app = create_app(AuthConfig)
+        load_user = auth.load_user
+
+        def legacy_load_user(user_id):
+            generate_password_hash(os.environ["PASSWORD"])
+            return load_user(user_id)
+
+        app.login_manager.user_loader(legacy_load_user)
+        # Every request re-derived the hash, so fewer iterations are enough
+        results.append(("auth enabled, per-request hashing", measure(app, max(1, args.requests // 20), login=True)))
+        app.login_manager.user_loader(load_user)
+
+    for label, rate in results:
+        print(f"{label:<36} {rate:10.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Encode time and payload size of a /data-sized response, per JSON encoder and compression.
+
+Usage: python benchmarks/bench_json.py [--containers N] [--rounds N]
+
+Both the row format and the /data?format=columnar format are measured.
+"""
+import argparse
+import gzip
+import json
+import random
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DISABLE_AUTH", "true")
+
+from dockpeek.columnar import to_columnar  # noqa: E402
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def make_container(i):
+    server = f"host-{i % 8}"
+    stack = f"stack-{i % 120}"
+    name = f"{stack}-service-{i}"
+    ports = [
+        {
+            'container_port': f"{8000 + p}/tcp",
+            'host_port': str(20000 + i * 3 + p),
+            'link': f"http://{server}.example.internal:{20000 + i * 3 + p}",
+            'is_custom': False
+        }
+        for p in range(random.randint(0, 3))
+    ]
+    routes = [
+        {
+            'router': f"{name}-router",
+            'url': f"https://{name}.example.com",
+            'rule': f"Host(`{name}.example.com`)",
+            'host': f"{name}.example.com"
+        }
+    ] if i % 3 == 0 else []
+    return {
+        'server': server,
+        'name': name,
+        'container_id': f"{i:012x}",
+        'status': random.choice(['running', 'running', 'running', 'exited', 'healthy']),
+        'started_at': '2024-05-01T12:00:00.000000000Z',
+        'exit_code': None,
+        'image': f"registry.example.com/team/{stack}:1.{i % 40}.{i % 7}",
+        'stack': stack,
+        'source_url': f"https://github.com/example/{stack}",
+        'custom_url': '',
+        'ports': ports,
+        'traefik_routes': routes,
+        'tags': ['prod', f"team-{i % 5}"],
+        'update_available': i % 11 == 0,
+        'port_range_grouping': True
+    }
+
+
+def timed(fn, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        result = fn()
+    return result, (time.perf_counter() - started) / rounds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--containers", type=int, default=3000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(42)
+    payload = {
+        'servers': [{'name': f"host-{i}", 'status': 'active', 'order': i, 'url': f"tcp://host-{i}:2375"} for i in range(8)],
+        'containers': [make_container(i) for i in range(args.containers)],
+        'swarm_servers': []
+    }
+
+    columnar, columnar_ms = timed(lambda: to_columnar(payload), args.rounds)
+    print(f"{args.containers} containers (columnar conversion {columnar_ms:.2f} ms)")
+
+    for format_label, data in (("rows", payload), ("columnar", columnar)):
+        encoders = [("json", lambda: json.dumps(data, sort_keys=True).encode('utf-8'))]
+        if orjson is not None:
+            encoders.append(("orjson", lambda: orjson.dumps(data, option=orjson.OPT_SORT_KEYS)))
+
+        print(f"{format_label}:")
+        body = None
+        for label, encode in encoders:
+            body, ms = timed(encode, args.rounds)
+            print(f"  encode {label:<22} {ms:8.2f} ms  {len(body):>10,} bytes")
+
+        compressors = [("gzip -6", lambda: gzip.compress(body, compresslevel=6))]
+        if brotli is not None:
+            compressors.append(("brotli q5", lambda: brotli.compress(body, quality=5)))
+
+        for label, compress in compressors:
+            compressed, ms = timed(compress, args.rounds)
+            ratio = len(compressed) / len(body) * 100
+            print(f"  {label:<29} {ms:8.2f} ms  {len(compressed):>10,} bytes ({ratio:.1f}%)")
+
+    if orjson is None:
+        print("orjson not installed, skipped")
+    if brotli is None:
+        print("brotli not installed, skipped")
+
+if __name__ == "__main__":
+    main()
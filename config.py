@@ -19,12 +19,18 @@ class Config:
     if not DISABLE_AUTH:
         ADMIN_USERNAME = os.environ.get("USERNAME")
         ADMIN_PASSWORD = os.environ.get("PASSWORD")
-        if not ADMIN_USERNAME or not ADMIN_PASSWORD:
-            raise RuntimeError("USERNAME and PASSWORD environment variables must be set.")
+        # Pre-hashed alternative to PASSWORD, as produced by werkzeug's generate_password_hash
+        ADMIN_PASSWORD_HASH = os.environ.get("PASSWORD_HASH")
+        if not ADMIN_USERNAME or not (ADMIN_PASSWORD or ADMIN_PASSWORD_HASH):
+            raise RuntimeError("USERNAME and PASSWORD (or PASSWORD_HASH) environment variables must be set.")
     else:
         ADMIN_USERNAME = None
         ADMIN_PASSWORD = None
+        ADMIN_PASSWORD_HASH = None
         
+    # Enables bearer tokens for API clients, see dockpeek/api_tokens.py
+    API_TOKEN_SECRET = os.environ.get("API_TOKEN_SECRET")
+
     TRAEFIK_ENABLE = os.environ.get("TRAEFIK_LABELS", "true").lower() == "true"
     TAGS_ENABLE = os.environ.get("TAGS", "true").lower() == "true"
     PORT_RANGE_GROUPING = os.environ.get("PORT_RANGE_GROUPING", "true").lower() == "true"
@@ -37,6 +43,17 @@ class Config:
     LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
 
     DOCKER_CONNECTION_TIMEOUT = float(os.environ.get("DOCKER_CONNECTION_TIMEOUT", "2"))
+
+    RESPONSE_COMPRESSION = os.environ.get("RESPONSE_COMPRESSION", "true").lower() == "true"
+    COMPRESSION_MIN_BYTES = int(os.environ.get("COMPRESSION_MIN_BYTES", "1024"))
+
+    LOG_BUFFER_LINES = int(os.environ.get("LOG_BUFFER_LINES", "0"))
+    LOG_BUFFER_IDLE_TIMEOUT = int(os.environ.get("LOG_BUFFER_IDLE_TIMEOUT", "900"))
+    LOG_BUFFER_MAX_MB = int(os.environ.get("LOG_BUFFER_MAX_MB", "64"))
+
+    LOG_STREAM_QUEUE_LINES = int(os.environ.get("LOG_STREAM_QUEUE_LINES", "5000"))
+    LOG_STREAM_BUFFER_MB = int(os.environ.get("LOG_STREAM_BUFFER_MB", "32"))
+    LOG_STREAM_SLOW_CONSUMER = os.environ.get("LOG_STREAM_SLOW_CONSUMER", "drop").lower()
     
     PORT = int(os.environ.get("PORT", "8000"))
     
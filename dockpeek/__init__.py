@@ -22,6 +22,11 @@ def create_app(config_class=Config):
     
     login_manager.init_app(app)
     cors.init_app(app)
+
+    from .json_provider import init_json_provider
+    from .compression import init_compression
+    init_json_provider(app)
+    init_compression(app)
     
     if not app.config.get('DISABLE_AUTH', False):
         logging.debug("Authentication enabled")
@@ -29,9 +34,25 @@ def create_app(config_class=Config):
         logging.info("Authentication disabled")
 
     from . import auth
+    auth.init_auth(app)
     app.register_blueprint(auth.auth_bp)
 
     from . import main
     app.register_blueprint(main.main_bp)
 
+    from .log_hub import log_stream_registry
+    log_stream_registry.configure(
+        app.config['LOG_STREAM_QUEUE_LINES'],
+        app.config['LOG_STREAM_BUFFER_MB'] * 1024 * 1024,
+        app.config['LOG_STREAM_SLOW_CONSUMER']
+    )
+
+    if app.config.get('LOG_BUFFER_LINES', 0) > 0:
+        from .log_buffer import recent_log_cache
+        recent_log_cache.configure(
+            app.config['LOG_BUFFER_LINES'],
+            app.config['LOG_BUFFER_IDLE_TIMEOUT'],
+            app.config['LOG_BUFFER_MAX_MB'] * 1024 * 1024
+        )
+
     return app
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""Stateless bearer tokens for API clients.
+
+A token is ``dp1.<payload>.<signature>``: the payload is base64url JSON with the
+client name, its scopes and an optional expiry, the signature an HMAC-SHA256 of
+``dp1.<payload>`` keyed from ``API_TOKEN_SECRET``. Verification needs no session,
+password hashing or server-side state; changing the secret revokes every token.
+
+Create a token with::
+
+    python -m dockpeek.api_tokens --name grafana --scopes read,logs --days 90
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from typing import Dict, Iterable, Optional
+
+TOKEN_PREFIX = 'dp1'
+TOKEN_SCOPES = ('read', 'logs', 'updates')
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+class ApiTokenSigner:
+    def __init__(self, secret: str):
+        # Derived so the raw secret is never used directly as a MAC key elsewhere
+        self._key = hmac.new(secret.encode('utf-8'), b'dockpeek-api-token', hashlib.sha256).digest()
+
+    def _sign(self, message: bytes) -> bytes:
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def issue(self, name: str, scopes: Iterable[str], expires_at: Optional[int] = None) -> str:
+        scopes = sorted(set(scopes))
+        unknown = [s for s in scopes if s not in TOKEN_SCOPES]
+        if unknown or not scopes:
+            raise ValueError(f"Scopes must be a non-empty subset of {', '.join(TOKEN_SCOPES)}")
+
+        claims = {'sub': name, 'scopes': scopes, 'iat': int(time.time())}
+        if expires_at is not None:
+            claims['exp'] = int(expires_at)
+        payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+        signing_input = f"{TOKEN_PREFIX}.{payload}"
+        return f"{signing_input}.{_b64encode(self._sign(signing_input.encode('ascii')))}"
+
+    def verify(self, token: str) -> Optional[Dict]:
+        try:
+            prefix, payload, signature = token.split('.')
+            if prefix != TOKEN_PREFIX:
+                return None
+            expected = self._sign(f"{prefix}.{payload}".encode('ascii'))
+            if not hmac.compare_digest(expected, _b64decode(signature)):
+                return None
+            claims = json.loads(_b64decode(payload))
+        except (ValueError, UnicodeError):
+            return None
+
+        if not isinstance(claims, dict):
+            return None
+        expires_at = claims.get('exp')
+        if expires_at is not None and expires_at < time.time():
+            return None
+        return claims
+
+
+class ApiTokens:
+    def __init__(self):
+        self._signers: Dict[str, ApiTokenSigner] = {}
+
+    def _signer(self, secret: str) -> ApiTokenSigner:
+        signer = self._signers.get(secret)
+        if signer is None:
+            signer = self._signers[secret] = ApiTokenSigner(secret)
+        return signer
+
+    def authorize(self, secret: Optional[str], token: str, scope: str) -> Optional[str]:
+        """Returns None when the token grants ``scope``, otherwise the reason it was refused."""
+        if not secret:
+            return "API tokens are not enabled"
+        claims = self._signer(secret).verify(token)
+        if claims is None:
+            return "Invalid or expired API token"
+        if scope not in claims.get('scopes', ()):
+            return f"API token lacks the '{scope}' scope"
+        return None
+
+
+api_tokens = ApiTokens()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create a dockpeek API token signed with API_TOKEN_SECRET.")
+    parser.add_argument('--name', required=True, help="Name of the client the token is for")
+    parser.add_argument('--scopes', default='read', help=f"Comma-separated scopes: {', '.join(TOKEN_SCOPES)}")
+    parser.add_argument('--days', type=float, help="Days until the token expires (default: never)")
+    args = parser.parse_args()
+
+    secret = os.environ.get('API_TOKEN_SECRET')
+    if not secret:
+        parser.error("API_TOKEN_SECRET environment variable must be set")
+
+    expires_at = int(time.time() + args.days * 86400) if args.days else None
+    try:
+        print(ApiTokenSigner(secret).issue(args.name, args.scopes.split(','), expires_at))
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,5 @@
+import hmac
+
 from flask import (
     Blueprint, render_template, request, redirect, url_for, session, current_app
 )
@@ -7,14 +9,19 @@ from .extensions import login_manager
 
 auth_bp = Blueprint('auth', __name__)
 
-def get_users():
-    if current_app.config.get('DISABLE_AUTH', False):
-        return {}
-    return {
-        current_app.config['ADMIN_USERNAME']: {
-            "password": generate_password_hash(current_app.config['ADMIN_PASSWORD'])
-        }
-    }
+def init_auth(app):
+    """Hashes the admin password once at startup; the plain text is not kept in the config."""
+    if app.config.get('DISABLE_AUTH', False):
+        return
+    if not app.config.get('ADMIN_PASSWORD_HASH'):
+        app.config['ADMIN_PASSWORD_HASH'] = generate_password_hash(app.config['ADMIN_PASSWORD'])
+    app.config['ADMIN_PASSWORD'] = None
+
+def is_admin_username(username):
+    admin_username = current_app.config.get('ADMIN_USERNAME')
+    if not username or not admin_username:
+        return False
+    return hmac.compare_digest(username.encode('utf-8'), admin_username.encode('utf-8'))
 
 class User(UserMixin):
     def __init__(self, id):
@@ -25,7 +32,7 @@ def load_user(user_id):
     if current_app.config.get('DISABLE_AUTH', False):
         return User('anonymous')
     
-    if user_id in get_users():
+    if is_admin_username(user_id):
         return User(user_id)
     return None
 
@@ -45,10 +52,10 @@ def login():
         username = request.form.get("username")
         password = request.form.get("password")
         
-        users = get_users()
-        user_record = users.get(username)
+        # The hash is checked even for unknown usernames so timing does not reveal valid ones
+        password_ok = check_password_hash(current_app.config['ADMIN_PASSWORD_HASH'], password or '')
 
-        if user_record and check_password_hash(user_record["password"], password):
+        if is_admin_username(username) and password_ok:
             login_user(User(username))
             session.permanent = True
             return redirect(url_for("main.index"))
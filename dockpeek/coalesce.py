@@ -0,0 +1,48 @@
+"""Single-flight coalescing of identical concurrent collection runs.
+
+The first caller for a key runs the collection; callers arriving while it is
+in flight wait for and share its result (or exception) instead of starting a
+fan-out of their own. Nothing is cached once the run completes. Shared
+results are handed to several requests at once and must not be mutated.
+"""
+import logging
+from concurrent.futures import Future
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class RequestCoalescer:
+    def __init__(self):
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = Lock()
+
+    def run(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+
+        if not leader:
+            logger.debug(f"Joining in-flight collection for {key}")
+            return future.result()
+
+        try:
+            result = fn()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            if not future.done():
+                # The leader was killed (e.g. GreenletExit), which must not propagate to the waiters
+                future.set_exception(RuntimeError(f"Collection for {key} was interrupted"))
+
+
+request_coalescer = RequestCoalescer()
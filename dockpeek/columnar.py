@@ -0,0 +1,155 @@
+"""Columnar wire format for the /data container list.
+
+Every container dict repeats the same keys, and values such as the server,
+image, stack and port link hostname repeat across thousands of rows. The
+columnar form sends one array per key and replaces each string with an
+index into a shared string table::
+
+    {
+        "format": "columnar",
+        "rows": 2,
+        "strings": ["srv1", "web", "db", ...],
+        "columns": [
+            {"key": "server", "type": "string", "values": [0, 0]},
+            {"key": "exit_code", "type": "raw", "values": [null, 0]},
+            {"key": "tags", "type": "strings", "values": [[3], []]},
+            {"key": "ports", "type": "ports", "values": [[4, 5, 6, 2], []]},
+            {"key": "traefik_routes", "type": "records",
+             "fields": ["router", "url", "rule", "host"], "values": [[], []]}
+        ]
+    }
+
+Column types:
+
+- ``string``: a string table index per row, or null for None.
+- ``strings``: a list of string table indices per row.
+- ``records``: a list of dicts with the same string-valued ``fields``,
+  flattened to one index per field per record.
+- ``ports``: port mappings flattened to ``container_port, host_port,
+  link, flags`` per port. Bit 0 of ``flags`` is ``is_custom``. When bit 1
+  is set, ``link`` only holds the prefix up to the host port (for example
+  ``http://host:``) and the host port is appended on decode. That way one
+  host's links share a single table entry.
+- ``raw``: any other JSON value, sent as is.
+
+Rows that lack a key, such as error placeholders, are listed in the
+column's ``missing`` array and decode without that key. The decoder is
+``decodeColumnarContainers`` in ``static/js/modules/data-fetch.js``.
+"""
+from itertools import chain
+from typing import Any, Dict, List, Optional
+
+PORT_FIELDS = ('container_port', 'host_port', 'link', 'is_custom')
+_PORT_KEYS = frozenset(PORT_FIELDS)
+PORT_FLAG_CUSTOM = 1
+PORT_FLAG_LINK_SUFFIX = 2
+
+_MISSING = object()
+
+
+class StringTable:
+    def __init__(self):
+        # Dicts keep insertion order, so the keys double as the table itself
+        self._index: Dict[str, int] = {}
+
+    @property
+    def strings(self) -> List[str]:
+        return list(self._index)
+
+    def intern(self, value: Optional[str]) -> Optional[int]:
+        if value is None:
+            return None
+        index = self._index
+        return index.setdefault(value, len(index))
+
+
+_STRING_TYPES = frozenset((str, type(None)))
+
+
+def _is_port(item: Dict) -> bool:
+    return (
+        item.keys() == _PORT_KEYS
+        and type(item['is_custom']) is bool
+        and type(item['container_port']) is str
+        and type(item['host_port']) is str
+        and type(item['link']) is str
+    )
+
+
+def _column_type(values: List[Any]):
+    """Returns the narrowest column type that fits every present value, and the record fields if any."""
+    if set(map(type, values)) <= _STRING_TYPES:
+        return 'string', None
+    if set(map(type, values)) != {list}:
+        return 'raw', None
+    items = list(chain.from_iterable(values))
+    item_types = set(map(type, items))
+    if item_types <= {str}:
+        return 'strings', None
+    if item_types == {dict}:
+        if all(map(_is_port, items)):
+            return 'ports', None
+        fields = list(items[0])
+        keys = set(fields)
+        # Empty records would encode to nothing and lose their count, they stay raw
+        if fields and all(item.keys() == keys and set(map(type, item.values())) <= _STRING_TYPES for item in items):
+            return 'records', fields
+    return 'raw', None
+
+
+def _encode_ports(ports: List[Dict], table: StringTable) -> List[int]:
+    encoded = []
+    for port in ports:
+        host_port, link = port['host_port'], port['link']
+        flags = PORT_FLAG_CUSTOM if port['is_custom'] else 0
+        if host_port and len(link) > len(host_port) and link.endswith(host_port):
+            link = link[:-len(host_port)]
+            flags |= PORT_FLAG_LINK_SUFFIX
+        encoded.extend((table.intern(port['container_port']), table.intern(host_port), table.intern(link), flags))
+    return encoded
+
+
+def encode_columnar_containers(containers: List[Dict]) -> Dict[str, Any]:
+    keys: Dict[str, None] = {}
+    for container in containers:
+        keys.update(dict.fromkeys(container))
+
+    table = StringTable()
+    columns = []
+    for key in keys:
+        raw_values = [container.get(key, _MISSING) for container in containers]
+        missing = [row for row, value in enumerate(raw_values) if value is _MISSING]
+        present = [value for value in raw_values if value is not _MISSING]
+        column_type, fields = _column_type(present)
+
+        column: Dict[str, Any] = {'key': key, 'type': column_type}
+        if column_type == 'string':
+            intern = table.intern
+            values = [intern(v) for v in present]
+        elif column_type == 'strings':
+            intern = table.intern
+            values = [[intern(s) for s in v] for v in present]
+        elif column_type == 'ports':
+            values = [_encode_ports(v, table) for v in present]
+        elif column_type == 'records':
+            intern = table.intern
+            values = [[intern(item[f]) for item in v for f in fields] for v in present]
+        else:
+            values = present
+        for row in missing:
+            values.insert(row, None)
+        if column_type == 'records':
+            column['fields'] = fields
+        if missing:
+            column['missing'] = missing
+        column['values'] = values
+        columns.append(column)
+
+    return {'format': 'columnar', 'rows': len(containers), 'strings': table.strings, 'columns': columns}
+
+
+def to_columnar(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns a copy of a get_all_data() result with ``containers`` in columnar form."""
+    encoded = dict(data)
+    encoded['containers'] = encode_columnar_containers(data.get('containers', []))
+    return encoded
@@ -0,0 +1,65 @@
+import gzip
+import logging
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_MIMETYPES = ('application/json',)
+
+
+def choose_encoding(accept_encodings) -> str:
+    if brotli is not None and accept_encodings['br'] > 0:
+        return 'br'
+    if accept_encodings['gzip'] > 0:
+        return 'gzip'
+    return ''
+
+
+def compress_body(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        # Quality 5 keeps brotli well ahead of gzip on size at a similar CPU cost
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+
+def init_compression(app):
+    if not app.config.get('RESPONSE_COMPRESSION', True):
+        return
+    min_size = app.config.get('COMPRESSION_MIN_BYTES', 1024)
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200 or response.status_code >= 300
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if response.content_length is not None and response.content_length < min_size:
+            return response
+
+        encoding = choose_encoding(request.accept_encodings)
+        if not encoding:
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        response.set_data(compress_body(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # A strong tag identifies the exact bytes, so each coding gets its own
+            response.set_etag(f"{etag}-{encoding}")
+        return response
@@ -0,0 +1,191 @@
+"""On-demand container details served by /container/<server>/<id>.
+
+/data stays a lean summary of every container; the full inspect (environment,
+mounts, networks, restart count, health log) is fetched only for the container
+a client asks about. Results sit in a small LRU keyed by container id. An
+entry is dropped when the Docker event stream reports a change for the
+container, when a /data or /status collection shows a different status or
+start time for it, or at the latest after ``ttl`` seconds.
+"""
+import re
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .docker_utils import get_container_status_with_exit_code
+
+# Env variables and labels (e.g. traefik ...basicauth.users) whose name matches are masked outright
+SENSITIVE_KEY_PATTERN = re.compile(r'PASSWORD|PASSWD|SECRET|TOKEN|KEY|CREDENTIAL|AUTH', re.IGNORECASE)
+# Credentials inside any URL value, such as postgres://user:pass@db/app
+URL_CREDENTIALS_PATTERN = re.compile(r'(://)[^/@\s]+@')
+MASKED_VALUE = '********'
+HEALTH_LOG_ENTRIES = 5
+
+CacheKey = Tuple[str, str]
+
+
+def _mask_value(name: str, value: str) -> str:
+    if SENSITIVE_KEY_PATTERN.search(name):
+        return MASKED_VALUE
+    return URL_CREDENTIALS_PATTERN.sub(rf'\1{MASKED_VALUE}@', value)
+
+
+def _mask_env(env: Optional[List[str]]) -> List[Dict]:
+    variables = []
+    for item in env or []:
+        name, _, value = item.partition('=')
+        variables.append({'name': name, 'value': _mask_value(name, value)})
+    return variables
+
+
+def _mask_labels(labels: Optional[Dict[str, str]]) -> Dict[str, str]:
+    return {name: _mask_value(name, value or '') for name, value in (labels or {}).items()}
+
+
+def build_container_details(server_name: str, container) -> Dict:
+    attrs = container.attrs
+    state = attrs.get('State') or {}
+    config = attrs.get('Config') or {}
+    host_config = attrs.get('HostConfig') or {}
+    health = state.get('Health') or {}
+    status, exit_code = get_container_status_with_exit_code(container)
+
+    return {
+        'server': server_name,
+        'name': container.name,
+        'container_id': container.id[:12],
+        'id': container.id,
+        'image': config.get('Image', ''),
+        'image_id': attrs.get('Image', ''),
+        'created': attrs.get('Created', ''),
+        'state': {
+            'status': status,
+            'exit_code': exit_code,
+            'started_at': state.get('StartedAt', ''),
+            'finished_at': state.get('FinishedAt', ''),
+            'restart_count': attrs.get('RestartCount', 0),
+            'oom_killed': state.get('OOMKilled', False),
+            'error': state.get('Error', ''),
+            'health': {
+                'status': health.get('Status'),
+                'failing_streak': health.get('FailingStreak', 0),
+                'log': [
+                    {
+                        'start': entry.get('Start'),
+                        'end': entry.get('End'),
+                        'exit_code': entry.get('ExitCode'),
+                        'output': (entry.get('Output') or '').strip()
+                    }
+                    for entry in (health.get('Log') or [])[-HEALTH_LOG_ENTRIES:]
+                ]
+            } if health else None
+        },
+        'config': {
+            'env': _mask_env(config.get('Env')),
+            'cmd': config.get('Cmd'),
+            'entrypoint': config.get('Entrypoint'),
+            'working_dir': config.get('WorkingDir', ''),
+            'user': config.get('User', ''),
+            'labels': _mask_labels(config.get('Labels'))
+        },
+        'restart_policy': host_config.get('RestartPolicy') or {},
+        'mounts': [
+            {
+                'type': m.get('Type'),
+                'source': m.get('Source') or m.get('Name', ''),
+                'destination': m.get('Destination'),
+                'mode': m.get('Mode', ''),
+                'read_only': not m.get('RW', True)
+            }
+            for m in attrs.get('Mounts') or []
+        ],
+        'networks': [
+            {
+                'name': name,
+                'ip_address': network.get('IPAddress', ''),
+                'gateway': network.get('Gateway', ''),
+                'mac_address': network.get('MacAddress', ''),
+                'aliases': network.get('Aliases') or []
+            }
+            for name, network in sorted(((attrs.get('NetworkSettings') or {}).get('Networks') or {}).items())
+        ],
+        'ports': (attrs.get('NetworkSettings') or {}).get('Ports') or {}
+    }
+
+
+def _state_token(row: Dict) -> Tuple:
+    return row.get('status'), row.get('started_at') or ''
+
+
+class ContainerDetailCache:
+    def __init__(self, max_entries: int = 256, ttl: float = 30):
+        self.max_entries = max_entries
+        # Safety net for changes nothing reports, e.g. a host without an event stream open
+        self.ttl = ttl
+        # (server, short id) -> (details, stored at)
+        self._entries: 'OrderedDict[CacheKey, Tuple[Dict, float]]' = OrderedDict()
+        # (server, name) -> (server, short id), so lookups and /status rows can go by name
+        self._names: Dict[CacheKey, CacheKey] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _resolve(self, server_name: str, ident: str) -> Optional[CacheKey]:
+        key = (server_name, ident[:12])
+        if key in self._entries:
+            return key
+        return self._names.get((server_name, ident))
+
+    def _drop(self, key: CacheKey):
+        details, _ = self._entries.pop(key)
+        self._names.pop((key[0], details['name']), None)
+
+    def get(self, server_name: str, ident: str) -> Optional[Dict]:
+        with self._lock:
+            key = self._resolve(server_name, ident)
+            if key is None:
+                return None
+            details, stored_at = self._entries[key]
+            if time.time() - stored_at > self.ttl:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return details
+
+    def put(self, details: Dict):
+        key = (details['server'], details['container_id'])
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (details, time.time())
+            self._names[(details['server'], details['name'])] = key
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, server_name: str, ident: str = '', name: str = ''):
+        with self._lock:
+            for candidate in (ident, name):
+                key = self._resolve(server_name, candidate) if candidate else None
+                if key is not None:
+                    self._drop(key)
+
+    def observe(self, rows: Iterable[Dict]):
+        """Drops entries whose status or start time differs from a freshly collected /data or /status row."""
+        if not self._entries:
+            return
+        with self._lock:
+            for row in rows:
+                key = self._names.get((row.get('server'), row.get('name')))
+                if key is None:
+                    continue
+                state = self._entries[key][0]['state']
+                if _state_token(state) != _state_token(row):
+                    self._drop(key)
+
+    def get_stats(self) -> Dict:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "ttl": self.ttl}
+
+
+container_detail_cache = ContainerDetailCache()
@@ -0,0 +1,259 @@
+"""Server-side filtering, sorting and pagination of the /data container list.
+
+Filters and sort orders mirror the dashboard's filters.js, so API clients get
+the same results as the UI. Exact-match filters (server, stack, status, tag,
+update_available) are answered from per-snapshot inverted indexes; the free
+text search, which uses the dashboard's substring semantics, only scans the
+rows left after them. Sort orders are computed once per snapshot and column.
+"""
+import re
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+SORT_COLUMNS = ('name', 'stack', 'server', 'image', 'status', 'ports', 'traefik')
+STATUS_ORDER = {
+    'starting': 1, 'restarting': 2, 'unhealthy': 3, 'removing': 4, 'created': 5,
+    'paused': 6, 'exited': 7, 'dead': 8, 'running': 9, 'healthy': 10
+}
+MAX_PAGE_SIZE = 1000
+
+SEARCH_TERM_PATTERN = re.compile(r'(?:[^\s"]+|"[^"]*")+')
+FREE_PORT_PATTERN = re.compile(r':free\s*\d*')
+QUERY_PARAMS = ('server', 'stack', 'status', 'tag', 'update_available', 'q', 'sort', 'order', 'page', 'limit')
+
+
+def _split(values: List[str]) -> Tuple[str, ...]:
+    return tuple(part.strip() for value in values for part in value.split(',') if part.strip())
+
+
+def _unquote(term: str) -> str:
+    return term[1:-1] if len(term) > 1 and term.startswith('"') and term.endswith('"') else term
+
+
+class SearchTerms(NamedTuple):
+    tags: Tuple[str, ...] = ()
+    ports: Tuple[str, ...] = ()
+    stacks: Tuple[str, ...] = ()
+    ids: Tuple[str, ...] = ()
+    general: Tuple[str, ...] = ()
+
+    @classmethod
+    def parse(cls, text: str) -> 'SearchTerms':
+        """Same grammar as parseAdvancedSearch in filters.js; ':free' lookups are UI-only and ignored."""
+        terms = {field: [] for field in cls._fields}
+        for term in SEARCH_TERM_PATTERN.findall(FREE_PORT_PATTERN.sub('', text)):
+            if term.startswith('#'):
+                terms['tags'].append(term[1:].lower())
+            elif term.startswith(':'):
+                terms['ports'].append(term[1:])
+            elif term.startswith('stack:'):
+                terms['stacks'].append(_unquote(term[6:]).lower())
+            elif term.startswith('id:'):
+                terms['ids'].append(_unquote(term[3:]).lower())
+            else:
+                terms['general'].append(_unquote(term).lower())
+        return cls(**{field: tuple(values) for field, values in terms.items()})
+
+    def matches(self, c: Dict) -> bool:
+        tags = [t.lower() for t in c.get('tags') or []]
+        ports = c.get('ports') or []
+        stack = (c.get('stack') or '').lower()
+        container_id = (c.get('container_id') or '').lower()
+        name = (c.get('name') or '').lower()
+        image = (c.get('image') or '').lower()
+
+        if not all(any(term in tag for tag in tags) for term in self.tags):
+            return False
+        if not all(term in container_id for term in self.ids):
+            return False
+        if not all(any(term in p['host_port'] for p in ports) for term in self.ports):
+            return False
+        if not all(term in stack for term in self.stacks):
+            return False
+        return all(
+            term in name or term in image or term in stack or term in container_id
+            or any(term in p['host_port'] or term in p['container_port'] for p in ports)
+            for term in self.general
+        )
+
+
+class ContainerQuery(NamedTuple):
+    servers: Tuple[str, ...] = ()
+    stacks: Tuple[str, ...] = ()
+    statuses: Tuple[str, ...] = ()
+    tags: Tuple[str, ...] = ()
+    update_available: Optional[bool] = None
+    search: Optional[SearchTerms] = None
+    sort: Optional[str] = None
+    descending: bool = False
+    page: int = 1
+    limit: Optional[int] = None
+
+    @classmethod
+    def from_args(cls, args) -> Optional['ContainerQuery']:
+        """Returns None when no query parameter is present. Raises ValueError on invalid values."""
+        if not any(name in args for name in QUERY_PARAMS):
+            return None
+
+        update_available = args.get('update_available')
+        if update_available is not None:
+            if update_available.lower() not in ('true', 'false', '1', '0'):
+                raise ValueError("update_available must be true or false")
+            update_available = update_available.lower() in ('true', '1')
+
+        sort = args.get('sort') or None
+        if sort is not None and sort not in SORT_COLUMNS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_COLUMNS)}")
+        order = args.get('order', 'asc')
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be asc or desc")
+
+        try:
+            page = int(args.get('page', 1))
+            limit = int(args['limit']) if 'limit' in args else None
+        except ValueError:
+            raise ValueError("page and limit must be integers")
+        if page < 1 or (limit is not None and not 1 <= limit <= MAX_PAGE_SIZE):
+            raise ValueError(f"page must be at least 1 and limit between 1 and {MAX_PAGE_SIZE}")
+
+        search_text = args.get('q', '').strip()
+        return cls(
+            servers=_split(args.getlist('server')),
+            stacks=tuple(s.lower() for s in _split(args.getlist('stack'))),
+            statuses=_split(args.getlist('status')),
+            tags=tuple(t.lower() for t in _split(args.getlist('tag'))),
+            update_available=update_available,
+            search=SearchTerms.parse(search_text) if search_text else None,
+            sort=sort,
+            descending=order == 'desc',
+            page=page,
+            limit=limit
+        )
+
+
+def _sort_key(column: str, c: Dict) -> Tuple[bool, Any]:
+    """(missing, value) as compared by the dashboard; rows without ports or routes sort last either way."""
+    if column == 'status':
+        return False, STATUS_ORDER.get(c.get('status'), 99)
+    if column == 'ports':
+        ports = c.get('ports') or []
+        if not ports:
+            return True, 0
+        try:
+            return False, int(ports[0]['host_port'])
+        except (TypeError, ValueError):
+            return True, 0
+    if column == 'traefik':
+        routes = c.get('traefik_routes') or []
+        return (True, '') if not routes else (False, routes[0]['url'].lower())
+    value = c.get(column)
+    return False, value.lower() if isinstance(value, str) else (value if value is not None else '')
+
+
+class ContainerIndex:
+    def __init__(self, containers: List[Dict]):
+        self.containers = containers
+        self.by_server: Dict[str, Set[int]] = defaultdict(set)
+        self.by_stack: Dict[str, Set[int]] = defaultdict(set)
+        self.by_status: Dict[str, Set[int]] = defaultdict(set)
+        self.by_tag: Dict[str, Set[int]] = defaultdict(set)
+        self.with_updates: Set[int] = set()
+        self._ranks: Dict[str, List[Tuple[bool, int]]] = {}
+
+        for row, c in enumerate(containers):
+            self.by_server[c.get('server')].add(row)
+            self.by_stack[(c.get('stack') or '').lower()].add(row)
+            self.by_status[c.get('status')].add(row)
+            for tag in c.get('tags') or []:
+                self.by_tag[tag.lower()].add(row)
+            if c.get('update_available'):
+                self.with_updates.add(row)
+
+    def _union(self, index: Dict[str, Set[int]], keys: Tuple[str, ...]) -> Set[int]:
+        rows = set()
+        for key in keys:
+            rows |= index.get(key, set())
+        return rows
+
+    def _ranks_for(self, column: str) -> List[Tuple[bool, int]]:
+        ranks = self._ranks.get(column)
+        if ranks is None:
+            keys = [_sort_key(column, c) for c in self.containers]
+            # Dense ranks, so equal values keep their original order in both directions
+            distinct = {value: rank for rank, value in enumerate(sorted({v for missing, v in keys if not missing}))}
+            ranks = self._ranks[column] = [(missing, 0 if missing else distinct[value]) for missing, value in keys]
+        return ranks
+
+    def select(self, query: ContainerQuery) -> List[int]:
+        candidates: Optional[Set[int]] = None
+
+        def narrow(rows: Set[int]):
+            nonlocal candidates
+            candidates = rows if candidates is None else candidates & rows
+
+        if query.servers:
+            narrow(self._union(self.by_server, query.servers))
+        if query.stacks:
+            narrow(self._union(self.by_stack, query.stacks))
+        if query.statuses:
+            narrow(self._union(self.by_status, query.statuses))
+        for tag in query.tags:
+            narrow(self.by_tag.get(tag, set()))
+        if query.update_available is not None:
+            if query.update_available:
+                narrow(self.with_updates)
+            else:
+                narrow(set(range(len(self.containers))) - self.with_updates)
+
+        rows = sorted(candidates) if candidates is not None else range(len(self.containers))
+        if query.search is not None:
+            rows = [row for row in rows if query.search.matches(self.containers[row])]
+        rows = list(rows)
+
+        if query.sort:
+            ranks = self._ranks_for(query.sort)
+            if query.descending:
+                rows.sort(key=lambda row: (ranks[row][0], -ranks[row][1]))
+            else:
+                rows.sort(key=ranks.__getitem__)
+        return rows
+
+
+class ContainerIndexCache:
+    """Indexes of the most recent /data snapshots, keyed by their content hash."""
+
+    def __init__(self, max_entries: int = 4):
+        self.max_entries = max_entries
+        self._indexes: 'OrderedDict[str, ContainerIndex]' = OrderedDict()
+
+    def get(self, version: str, containers: List[Dict]) -> ContainerIndex:
+        index = self._indexes.get(version)
+        if index is None:
+            index = self._indexes[version] = ContainerIndex(containers)
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+        else:
+            self._indexes.move_to_end(version)
+        return index
+
+
+container_index_cache = ContainerIndexCache()
+
+
+def apply_query(data: Dict[str, Any], query: ContainerQuery, version: str) -> Dict[str, Any]:
+    """Returns a copy of a get_all_data() result holding only the requested page of matching containers."""
+    index = container_index_cache.get(version, data.get('containers', []))
+    rows = index.select(query)
+
+    total = len(rows)
+    if query.limit is not None:
+        start = (query.page - 1) * query.limit
+        rows = rows[start:start + query.limit]
+
+    result = dict(data)
+    result['containers'] = [index.containers[row] for row in rows]
+    result['total'] = total
+    result['page'] = query.page
+    result['limit'] = query.limit
+    result['pages'] = -(-total // query.limit) if query.limit else 1
+    return result
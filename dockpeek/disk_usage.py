@@ -0,0 +1,173 @@
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait
+from threading import Lock
+from typing import Dict, List, Optional
+
+from .docker_utils import DockerClientFactory
+
+logger = logging.getLogger(__name__)
+
+
+def image_unique_sizes(df: Optional[Dict]) -> Dict[str, int]:
+    # SharedSize is -1 when the daemon could not compute it
+    sizes = {}
+    for img in (df or {}).get('Images') or []:
+        size = img.get('Size', 0) or 0
+        shared_size = img.get('SharedSize', -1)
+        if shared_size is not None and shared_size >= 0:
+            sizes[img.get('Id')] = max(size - shared_size, 0)
+    return sizes
+
+
+def summarize_disk_usage(df: Dict) -> Dict:
+    images = df.get('Images') or []
+    containers = df.get('Containers') or []
+    volumes = df.get('Volumes') or []
+    build_cache = df.get('BuildCache') or []
+
+    unique_sizes = image_unique_sizes(df)
+    unused_images = [img for img in images if img.get('Containers', 0) == 0]
+
+    volume_sizes = [
+        (v.get('UsageData') or {}).get('Size', -1)
+        for v in volumes
+    ]
+    unused_volume_sizes = [
+        (v.get('UsageData') or {}).get('Size', -1)
+        for v in volumes
+        if (v.get('UsageData') or {}).get('RefCount', 0) == 0
+    ]
+
+    return {
+        'images': {
+            'count': len(images),
+            'active': len(images) - len(unused_images),
+            'size': df.get('LayersSize', 0) or 0,
+            'reclaimable': sum(unique_sizes.get(img.get('Id'), img.get('Size', 0) or 0) for img in unused_images)
+        },
+        'containers': {
+            'count': len(containers),
+            'active': sum(1 for c in containers if c.get('State') == 'running'),
+            'size': sum(c.get('SizeRw', 0) or 0 for c in containers),
+            'reclaimable': sum(c.get('SizeRw', 0) or 0 for c in containers if c.get('State') != 'running')
+        },
+        'volumes': {
+            'count': len(volumes),
+            'active': len(volumes) - len(unused_volume_sizes),
+            'size': sum(s for s in volume_sizes if s > 0),
+            'reclaimable': sum(s for s in unused_volume_sizes if s > 0)
+        },
+        'build_cache': {
+            'count': len(build_cache),
+            'active': sum(1 for b in build_cache if b.get('InUse')),
+            'size': sum(b.get('Size', 0) or 0 for b in build_cache if not b.get('Shared')),
+            'reclaimable': sum(b.get('Size', 0) or 0 for b in build_cache if not b.get('InUse') and not b.get('Shared'))
+        }
+    }
+
+
+class DiskUsageCache:
+    def __init__(self, ttl_seconds: int = 120, client_factory: Optional[DockerClientFactory] = None,
+                 host_timeout: float = 60.0):
+        self._cache = {}
+        self._lock = Lock()
+        self._ttl = ttl_seconds
+        self.client_factory = client_factory or DockerClientFactory()
+        self.host_timeout = host_timeout
+        self._refreshing: Dict[str, Future] = {}
+        self._background = ThreadPoolExecutor(max_workers=4)
+
+    def _fetch(self, server: Dict) -> Dict:
+        # /system/df walks every layer and container filesystem, so it gets the long timeout
+        client = self.client_factory.create_client(server['url'], use_long_timeout=True)
+        try:
+            return client.df()
+        finally:
+            client.close()
+
+    def get(self, server: Dict, use_cache: bool = True) -> Optional[Dict]:
+        key = server['name']
+        if use_cache:
+            with self._lock:
+                entry = self._cache.get(key)
+                if entry and time.time() - entry[1] < self._ttl:
+                    return entry[0]
+
+        try:
+            df = self._fetch(server)
+        except Exception as e:
+            logger.warning(f"Could not get disk usage for {key}: {e}")
+            return None
+
+        with self._lock:
+            self._cache[key] = (df, time.time())
+        return df
+
+    def _refresh(self, server: Dict) -> Optional[Dict]:
+        try:
+            return self.get(server, use_cache=False)
+        finally:
+            with self._lock:
+                self._refreshing.pop(server['name'], None)
+
+    def get_nowait(self, server: Dict, wait: float = 0) -> Optional[Dict]:
+        """Cached df for callers that must stay fast.
+
+        Without a fresh entry a background refresh is started (one per host) and
+        awaited for at most ``wait`` seconds; until it lands the last known df,
+        if any, is returned, otherwise None.
+        """
+        key = server['name']
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and time.time() - entry[1] < self._ttl:
+                return entry[0]
+            future = self._refreshing.get(key)
+            if future is None:
+                future = self._refreshing[key] = self._background.submit(self._refresh, server)
+
+        try:
+            return future.result(timeout=wait)
+        except FuturesTimeoutError:
+            return entry[0] if entry else None
+
+    def invalidate(self, server_name: Optional[str] = None):
+        with self._lock:
+            if server_name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(server_name, None)
+
+    def get_host_summary(self, server: Dict, use_cache: bool = True) -> Dict:
+        df = self.get(server, use_cache)
+        if df is None:
+            return {'server': server['name'], 'error': 'Disk usage unavailable'}
+        return {'server': server['name'], **summarize_disk_usage(df)}
+
+    def get_summaries(self, servers: List[Dict], use_cache: bool = True) -> List[Dict]:
+        if not servers:
+            return []
+
+        summaries = []
+        executor = ThreadPoolExecutor(max_workers=len(servers))
+        try:
+            future_to_server = {
+                executor.submit(self.get_host_summary, server, use_cache): server
+                for server in servers
+            }
+            # One deadline for all hosts; a hung daemon is left behind instead of holding the request
+            _, not_done = wait(future_to_server, timeout=self.host_timeout)
+
+            for future, server in future_to_server.items():
+                if future in not_done:
+                    logger.error(f"Timeout getting disk usage for {server['name']} after {self.host_timeout}s")
+                    summaries.append({'server': server['name'], 'error': 'timeout'})
+                    continue
+                summaries.append(future.result())
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return summaries
+
+
+disk_usage_cache = DiskUsageCache()
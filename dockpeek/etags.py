@@ -0,0 +1,66 @@
+"""Conditional GET support for the polled JSON endpoints.
+
+A collection run is serialized once into a ``JsonSnapshot`` whose ETag is
+the hash of those bytes; coalesced requests share it, and a 200 sends the
+same bytes without encoding them again. Derived views (queries, other
+formats, exports) hash only the snapshot tag and their own parameters, so a
+304 is returned before anything is serialized or compressed.
+Compressed responses carry the tag with the content coding appended
+(``"<hash>-br"``), see ``dockpeek.compression``; the client's If-None-Match
+matches regardless of the coding it was served with.
+"""
+import hashlib
+from typing import Any, NamedTuple, Optional
+
+from flask import Response, current_app, request
+
+
+def compute_etag(*parts: Any) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(current_app.json.dumps(part, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class JsonSnapshot(NamedTuple):
+    data: Any
+    body: bytes
+    etag: str
+
+
+def json_snapshot(data: Any) -> JsonSnapshot:
+    body = current_app.json.response(data).get_data()
+    return JsonSnapshot(data, body, hashlib.blake2b(body, digest_size=16).hexdigest())
+
+
+def snapshot_response(snapshot: JsonSnapshot) -> Response:
+    response = current_app.response_class(snapshot.body, mimetype=current_app.json.mimetype)
+    return with_etag(response, snapshot.etag)
+
+
+def not_modified(etag: str, weak: bool = False) -> Optional[Response]:
+    """Returns a 304 response when the request's If-None-Match already holds ``etag``."""
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return None
+
+    for tag in if_none_match.as_set(include_weak=True):
+        if tag.split('-', 1)[0] == etag:
+            response = current_app.response_class(status=304)
+            # Echo the coding-specific tag the client holds, which is what a 200 would carry
+            response.set_etag(tag, weak=weak)
+            response.vary.add('Accept-Encoding')
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+    if if_none_match.star_tag:
+        response = current_app.response_class(status=304)
+        response.set_etag(etag, weak=weak)
+        return response
+    return None
+
+
+def with_etag(response: Response, etag: str, weak: bool = False) -> Response:
+    response.set_etag(etag, weak=weak)
+    # Cached copies must be revalidated, which is what makes the 304 path reachable
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
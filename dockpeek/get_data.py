@@ -135,8 +135,12 @@ def extract_container_ports(container_attrs):
     return published_ports
 
 
+def get_stack_name(labels):
+    return labels.get('com.docker.compose.project', '') or labels.get('com.docker.stack.namespace', '')
+
+
 def extract_labels_data(labels, tags_enable):
-    stack_name = labels.get('com.docker.compose.project', '') or labels.get('com.docker.stack.namespace', '')
+    stack_name = get_stack_name(labels)
     source_url = labels.get('org.opencontainers.image.source') or labels.get('org.opencontainers.image.url', '')
     custom_url = labels.get('dockpeek.link', '')
     custom_ports = labels.get('dockpeek.ports', '') or labels.get('dockpeek.port', '')
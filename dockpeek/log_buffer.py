@@ -0,0 +1,232 @@
+import logging
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import gevent
+from gevent.lock import RLock
+
+from .docker_utils import create_streaming_client
+from .logs_manager import LogLine, format_log_timestamp, open_log_stream, scan_log_lines
+
+logger = logging.getLogger(__name__)
+
+
+class ContainerLogBuffer:
+    """Ring buffer of the most recent lines of one container, kept warm by a follow stream."""
+
+    RETRY_DELAY = 5
+
+    def __init__(self, cache: 'RecentLogCache', key: Tuple, server_url: str, name: str,
+                 is_swarm: bool, max_lines: int):
+        self.cache = cache
+        self.key = key
+        self.server_url = server_url
+        self.name = name
+        self.is_swarm = is_swarm
+        self.lines = deque()
+        self.max_lines = max_lines
+        self.size = 0
+        # True once the oldest buffered line is also the first line the daemon has
+        self.history_complete = False
+        self.ready = False
+        self.closed = False
+        self.last_access = time.monotonic()
+        self._client = None
+        self._reader = None
+
+    def start(self):
+        self._reader = gevent.spawn(self._run)
+
+    def touch(self):
+        self.last_access = time.monotonic()
+
+    def _append(self, line: LogLine):
+        if self.closed:
+            return
+        # Stream lines are views into shared read chunks, copy so the chunks can be freed
+        line = LogLine(line.stream, line.timestamp, bytes(line.data))
+        self.lines.append(line)
+        self.size += len(line.data)
+        self.cache.total_bytes += len(line.data)
+        while len(self.lines) > self.max_lines:
+            dropped = self.lines.popleft()
+            self.size -= len(dropped.data)
+            self.cache.total_bytes -= len(dropped.data)
+            self.history_complete = False
+
+    def _seed(self):
+        seed = list(scan_log_lines(self._client, self.name, self.is_swarm, tail=self.max_lines + 1))
+        self.history_complete = len(seed) <= self.max_lines
+        for line in seed[-self.max_lines:]:
+            self._append(line)
+        self.ready = True
+
+    def _follow(self):
+        # Resume from the newest buffered line; the daemon filters by whole seconds
+        last_ts = self.lines[-1].timestamp if self.lines else None
+        seen_at_last = sum(1 for line in self.lines if line.timestamp == last_ts) if last_ts else 0
+
+        log_stream = open_log_stream(
+            self._client, self.name, self.is_swarm,
+            since=last_ts[0] if last_ts else None,
+            tail='all' if last_ts else 0,
+            follow=True
+        )
+        try:
+            for line in log_stream:
+                if last_ts and line.timestamp is not None:
+                    if line.timestamp < last_ts:
+                        continue
+                    if line.timestamp == last_ts and seen_at_last:
+                        seen_at_last -= 1
+                        continue
+                self._append(line)
+                self.cache.enforce_limit()
+                if self.closed:
+                    return
+        finally:
+            log_stream.close()
+
+    def _run(self):
+        try:
+            self._client = create_streaming_client(self.server_url)
+            self._seed()
+            self.cache.enforce_limit()
+            while not self.closed:
+                try:
+                    self._follow()
+                except gevent.GreenletExit:
+                    raise
+                except Exception as e:
+                    logger.debug(f"Log buffer stream for {self.name} interrupted: {e}")
+                # The stream ends when the container stops; keep the buffer and retry
+                gevent.sleep(self.RETRY_DELAY)
+        except gevent.GreenletExit:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not buffer logs for {self.name}: {e}")
+        finally:
+            self.close()
+
+    def close(self):
+        if self.closed and self._client is None:
+            return
+        self.closed = True
+        client, self._client = self._client, None
+        self.cache.discard(self)
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+        reader = self._reader
+        if reader is not None and reader is not gevent.getcurrent():
+            reader.kill(block=False)
+
+    def get_page(self, page_size: int) -> Optional[Dict]:
+        if not self.ready:
+            return None
+        page_size = max(1, page_size)
+        if page_size > len(self.lines) and not self.history_complete:
+            return None
+
+        entries = list(self.lines)[-page_size:]
+        has_more = len(self.lines) > page_size or not self.history_complete
+        cursor = None
+        if entries and entries[0].timestamp:
+            first_ts = entries[0].timestamp
+            cursor = {
+                'timestamp': format_log_timestamp(first_ts),
+                'offset': sum(1 for line in entries if line.timestamp == first_ts)
+            }
+
+        return {
+            'success': True,
+            'container_name': self.name,
+            'logs': b''.join(line.data for line in entries).decode('utf-8', errors='replace'),
+            'lines': len(entries),
+            'has_more': has_more and cursor is not None,
+            'cursor': cursor,
+            'buffered': True
+        }
+
+
+class RecentLogCache:
+    def __init__(self, max_lines: int = 0, idle_seconds: float = 900, max_bytes: int = 64 * 1024 * 1024):
+        self.max_lines = max_lines
+        self.idle_seconds = idle_seconds
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._buffers: Dict[Tuple, ContainerLogBuffer] = {}
+        self._lock = RLock()
+        self._sweeper = None
+
+    def configure(self, max_lines: int, idle_seconds: float, max_bytes: int):
+        self.max_lines = max_lines
+        self.idle_seconds = idle_seconds
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_lines > 0 and self.max_bytes > 0
+
+    def get_page(self, server_url: str, name: str, is_swarm: bool, page_size: int) -> Optional[Dict]:
+        """Serves the newest page from a warm buffer, or starts buffering for the next open."""
+        key = (server_url, name, bool(is_swarm))
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = ContainerLogBuffer(self, key, server_url, name, is_swarm, self.max_lines)
+                self._buffers[key] = buffer
+                buffer.start()
+                self._ensure_sweeper()
+        buffer.touch()
+        return buffer.get_page(page_size)
+
+    def discard(self, buffer: ContainerLogBuffer):
+        with self._lock:
+            if self._buffers.get(buffer.key) is buffer:
+                del self._buffers[buffer.key]
+                self.total_bytes -= buffer.size
+                buffer.size = 0
+
+    def enforce_limit(self):
+        if self.total_bytes <= self.max_bytes:
+            return
+        with self._lock:
+            victims = sorted(self._buffers.values(), key=lambda b: b.last_access)
+        for buffer in victims:
+            if self.total_bytes <= self.max_bytes:
+                break
+            logger.debug(f"Evicting log buffer for {buffer.name} to stay under the memory cap")
+            buffer.close()
+
+    def _ensure_sweeper(self):
+        if self._sweeper is None or self._sweeper.dead:
+            self._sweeper = gevent.spawn(self._sweep)
+
+    def _sweep(self):
+        while True:
+            gevent.sleep(min(60, max(1, self.idle_seconds / 4)))
+            now = time.monotonic()
+            with self._lock:
+                idle = [b for b in self._buffers.values() if now - b.last_access > self.idle_seconds]
+                if not self._buffers:
+                    self._sweeper = None
+                    return
+            for buffer in idle:
+                logger.debug(f"Evicting idle log buffer for {buffer.name}")
+                buffer.close()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            buffers = list(self._buffers.values())
+        return {
+            'buffers': len(buffers),
+            'lines': sum(len(b.lines) for b in buffers),
+            'bytes': self.total_bytes
+        }
+
+
+recent_log_cache = RecentLogCache()
@@ -0,0 +1,135 @@
+import logging
+import tarfile
+import time
+import zlib
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .docker_utils import create_streaming_client
+from .logs_manager import scan_log_lines
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('gzip', 'tar.gz')
+EXPORT_CHUNK_SIZE = 256 * 1024
+# Members of a tar archive need their size up front, so a log is buffered in memory
+# and written as parts of at most this size (name.log.000, name.log.001, ...)
+EXPORT_SPOOL_MEMORY = 8 * 1024 * 1024
+
+
+class LogExportTarget(NamedTuple):
+    server_name: str
+    server_url: str
+    name: str
+    is_swarm: bool
+
+    @property
+    def label(self) -> str:
+        return f"{self.server_name}/{self.name}"
+
+
+class GzipStream:
+    def __init__(self, level: int = 6):
+        # wbits=31 writes a gzip header and trailer around the deflate stream
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def write(self, data) -> bytes:
+        return self._compressor.compress(data)
+
+    def close(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+def iter_log_chunks(target: LogExportTarget, since: Optional[Tuple[int, int]] = None,
+                    until: Optional[Tuple[int, int]] = None, prefix: bytes = b'') -> Iterator[bytes]:
+    client = create_streaming_client(target.server_url)
+    try:
+        chunk = bytearray()
+        for line in scan_log_lines(client, target.name, target.is_swarm, since, until):
+            if prefix:
+                chunk += prefix
+            chunk += line.data
+            if len(chunk) >= EXPORT_CHUNK_SIZE:
+                yield bytes(chunk)
+                chunk.clear()
+        if chunk:
+            yield bytes(chunk)
+    except Exception as e:
+        logger.error(f"Error exporting logs for {target.label}: {e}")
+        yield f"Error exporting logs for {target.label}: {e}\n".encode()
+    finally:
+        client.close()
+
+
+def export_logs_gzip(targets: List[LogExportTarget], since: Optional[Tuple[int, int]] = None,
+                     until: Optional[Tuple[int, int]] = None) -> Iterator[bytes]:
+    gzip_stream = GzipStream()
+    # Lines are only labelled when several sources share one file
+    labelled = len(targets) > 1
+    for target in targets:
+        prefix = f"[{target.label}] ".encode() if labelled else b''
+        for chunk in iter_log_chunks(target, since, until, prefix):
+            compressed = gzip_stream.write(chunk)
+            if compressed:
+                yield compressed
+    yield gzip_stream.close()
+
+
+def _tar_member_name(target: LogExportTarget, used: Dict[str, int]) -> str:
+    name = f"{target.server_name}/{target.name}.log".replace('..', '_')
+    count = used.get(name, 0)
+    used[name] = count + 1
+    return name if not count else f"{name[:-4]}-{count}.log"
+
+
+def export_logs_tar(targets: List[LogExportTarget], since: Optional[Tuple[int, int]] = None,
+                    until: Optional[Tuple[int, int]] = None) -> Iterator[bytes]:
+    gzip_stream = GzipStream()
+    used_names: Dict[str, int] = {}
+    archive_size = 0
+
+    def emit(data) -> Iterator[bytes]:
+        compressed = gzip_stream.write(data)
+        if compressed:
+            yield compressed
+
+    def member(name: str, data) -> Iterator[bytes]:
+        nonlocal archive_size
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        info.mode = 0o644
+        header = info.tobuf(format=tarfile.PAX_FORMAT)
+        yield from emit(header)
+        for offset in range(0, len(data), EXPORT_CHUNK_SIZE):
+            yield from emit(data[offset:offset + EXPORT_CHUNK_SIZE])
+        padding = -len(data) % tarfile.BLOCKSIZE
+        if padding:
+            yield from emit(tarfile.NUL * padding)
+        archive_size += len(header) + len(data) + padding
+
+    for target in targets:
+        name = _tar_member_name(target, used_names)
+        buffer = bytearray()
+        part = 0
+        for chunk in iter_log_chunks(target, since, until):
+            buffer += chunk
+            # Only a log larger than one part is split, smaller ones keep their plain name
+            while len(buffer) > EXPORT_SPOOL_MEMORY:
+                yield from member(f"{name}.{part:03d}", buffer[:EXPORT_SPOOL_MEMORY])
+                del buffer[:EXPORT_SPOOL_MEMORY]
+                part += 1
+        yield from member(f"{name}.{part:03d}" if part else name, buffer)
+
+    # End-of-archive marker, then pad to a full record like tarfile does
+    trailer = tarfile.NUL * (2 * tarfile.BLOCKSIZE)
+    archive_size += len(trailer)
+    trailer += tarfile.NUL * (-archive_size % tarfile.RECORDSIZE)
+    yield from emit(trailer)
+    yield gzip_stream.close()
+
+
+def export_logs(targets: List[LogExportTarget], export_format: str = 'gzip',
+                since: Optional[Tuple[int, int]] = None, until: Optional[Tuple[int, int]] = None) -> Iterator[bytes]:
+    if export_format == 'tar.gz':
+        return export_logs_tar(targets, since, until)
+    return export_logs_gzip(targets, since, until)
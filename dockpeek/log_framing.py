@@ -0,0 +1,88 @@
+import json
+import zlib
+from typing import Dict, List, Optional
+
+from .logs_manager import LogLine
+
+# Prefix marking control records (heartbeat, error, ...) in raw text framing
+RAW_CONTROL_PREFIX = '\x1e'
+
+FRAMING_MODES = ('line', 'batch', 'raw')
+
+
+class LogFrameEncoder:
+    def __init__(self, mode: str = 'line', compress: bool = False):
+        self.mode = mode if mode in FRAMING_MODES else 'line'
+        self.compress = compress
+        # wbits=31 produces a gzip stream the browser inflates transparently
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    @property
+    def mimetype(self) -> str:
+        return 'text/plain' if self.mode == 'raw' else 'application/x-ndjson'
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+            'Connection': 'keep-alive',
+            'X-Log-Framing': self.mode
+        }
+        if self.compress:
+            headers['Content-Encoding'] = 'gzip'
+            headers['Vary'] = 'Accept-Encoding'
+        return headers
+
+    def _finish(self, payload: str) -> bytes:
+        data = payload.encode('utf-8')
+        if self._compressor is None:
+            return data
+        # Sync flush so every frame reaches the browser without waiting for more input
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def encode_lines(self, lines: List[LogLine], labels: Optional[List[str]] = None,
+                     cursor: Optional[Dict] = None, fields: Optional[List[Dict]] = None) -> bytes:
+        texts = [line.text() for line in lines]
+        if self.mode == 'batch':
+            frame = {"lines": texts}
+            stderr = [i for i, line in enumerate(lines) if line.stream == 'stderr']
+            if stderr:
+                frame["stderr"] = stderr
+            if labels is not None:
+                frame["labels"] = labels
+            if cursor is not None:
+                frame["cursor"] = cursor
+            if fields is not None:
+                frame["fields"] = fields
+            payload = json.dumps(frame) + "\n"
+        elif self.mode == 'raw':
+            if labels is not None:
+                texts = [f"[{label}] {text}" for label, text in zip(labels, texts)]
+            payload = ''.join(text if text.endswith('\n') else text + '\n' for text in texts)
+        else:
+            records = []
+            for i, (text, line) in enumerate(zip(texts, lines)):
+                record = {"line": text, "stream": line.stream}
+                if labels is not None:
+                    record["label"] = labels[i]
+                if fields is not None:
+                    record["fields"] = fields[i]
+                records.append(json.dumps(record) + "\n")
+            payload = ''.join(records)
+        if cursor is not None and self.mode != 'batch':
+            payload += self._control_record({"cursor": cursor})
+        return self._finish(payload)
+
+    def _control_record(self, event: Dict) -> str:
+        if self.mode == 'raw':
+            return RAW_CONTROL_PREFIX + json.dumps(event) + "\n"
+        return json.dumps(event) + "\n"
+
+    def encode_event(self, event: Dict) -> bytes:
+        return self._finish(self._control_record(event))
+
+    def close(self) -> bytes:
+        if self._compressor is None:
+            return b''
+        return self._compressor.flush(zlib.Z_FINISH)
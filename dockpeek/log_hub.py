@@ -0,0 +1,366 @@
+import logging
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple, Union
+
+import gevent
+from gevent.event import Event
+from gevent.lock import RLock
+from gevent.queue import Empty
+
+from .docker_utils import create_streaming_client
+from .logs_manager import LogLine, LogResumeFilter, log_line_hash, stream_container_logs, stream_service_logs
+
+logger = logging.getLogger(__name__)
+
+SLOW_CONSUMER_POLICIES = ('drop', 'pause')
+
+
+def _detached(line: LogLine) -> LogLine:
+    # Split lines are views into the whole read chunk; a queued or replayed view would
+    # keep that chunk alive while the byte budget only counts the line
+    if isinstance(line.data, memoryview):
+        return LogLine(line.stream, line.timestamp, bytes(line.data))
+    return line
+
+
+class StreamBufferLimits:
+    """Bounds on the lines queued for log stream consumers of one worker, with counters."""
+
+    def __init__(self, max_queue_lines: int = 5000, max_bytes: int = 32 * 1024 * 1024, policy: str = 'drop'):
+        self.max_queue_lines = max_queue_lines
+        self.max_bytes = max_bytes
+        self.policy = policy if policy in SLOW_CONSUMER_POLICIES else 'drop'
+        self.buffered_bytes = 0
+        # Part of buffered_bytes held by the hubs' replay rings rather than consumer queues
+        self.replay_bytes = 0
+        self.peak_bytes = 0
+        self.cap_hits = 0
+        self.dropped_lines = 0
+        self.pauses = 0
+        self.paused_seconds = 0.0
+
+    def reserve(self, size: int, force: bool = False) -> bool:
+        if not force and self.buffered_bytes + size > self.max_bytes:
+            self.cap_hits += 1
+            return False
+        self.buffered_bytes += size
+        self.peak_bytes = max(self.peak_bytes, self.buffered_bytes)
+        return True
+
+    def release(self, size: int):
+        self.buffered_bytes -= size
+
+    def get_stats(self) -> Dict:
+        return {
+            "policy": self.policy,
+            "max_queue_lines": self.max_queue_lines,
+            "max_bytes": self.max_bytes,
+            "buffered_bytes": self.buffered_bytes,
+            "replay_bytes": self.replay_bytes,
+            "peak_bytes": self.peak_bytes,
+            "cap_hits": self.cap_hits,
+            "dropped_lines": self.dropped_lines,
+            "pauses": self.pauses,
+            "paused_seconds": round(self.paused_seconds, 3)
+        }
+
+
+class LogSubscription:
+    """Bounded queue between a hub and one consumer.
+
+    A full queue either drops its oldest lines, reported to the consumer as a
+    ('skipped', count) message, or pauses the hub's upstream reader until the
+    consumer catches up. Pausing a shared hub stalls its other consumers too.
+    """
+
+    def __init__(self, hub: 'LogStreamHub', limits: StreamBufferLimits):
+        self.hub = hub
+        self.limits = limits
+        self.skipped = 0
+        self.closed = False
+        self._messages = deque()
+        self._queued_lines = 0
+        self._queued_bytes = 0
+        self._available = Event()
+        self._space = Event()
+
+    def _admit(self, size: int) -> bool:
+        if self._queued_lines >= self.limits.max_queue_lines:
+            return False
+        # A consumer with an empty queue always gets the next line, so a full budget cannot starve it
+        return self.limits.reserve(size, force=not self._queued_lines)
+
+    def _drop_oldest(self) -> bool:
+        for i, (msg_type, data) in enumerate(self._messages):
+            if msg_type == 'log':
+                del self._messages[i]
+                self._dequeued(len(data.data))
+                self.skipped += 1
+                self.limits.dropped_lines += 1
+                return True
+        return False
+
+    def _dequeued(self, size: int):
+        self._queued_lines -= 1
+        self._queued_bytes -= size
+        self.limits.release(size)
+
+    def put(self, message: Tuple[str, Optional[str]], block: bool = True):
+        if self.closed:
+            return
+        msg_type, data = message
+        if msg_type == 'log':
+            size = len(data.data)
+            while not self._admit(size):
+                if block and self.limits.policy == 'pause':
+                    self.limits.pauses += 1
+                    paused_at = time.monotonic()
+                    self._space.clear()
+                    self._space.wait()
+                    self.limits.paused_seconds += time.monotonic() - paused_at
+                    if self.closed:
+                        return
+                elif not self._drop_oldest():
+                    self.skipped += 1
+                    self.limits.dropped_lines += 1
+                    self._available.set()
+                    return
+            self._queued_lines += 1
+            self._queued_bytes += size
+        self._messages.append(message)
+        self._available.set()
+
+    def get(self, timeout: Optional[float] = None):
+        if not self._messages and not self.skipped:
+            self._available.clear()
+            self._available.wait(timeout)
+        if self.skipped:
+            skipped, self.skipped = self.skipped, 0
+            return ('skipped', skipped)
+        if not self._messages:
+            raise Empty()
+
+        message = self._messages.popleft()
+        if message[0] == 'log':
+            self._dequeued(len(message[1].data))
+            self._space.set()
+        return message
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.limits.release(self._queued_bytes)
+            self._messages.clear()
+            self._queued_lines = self._queued_bytes = 0
+            self._space.set()
+        self.hub.unsubscribe(self)
+
+
+class LogStreamHub:
+    def __init__(self, registry: Optional['LogStreamRegistry'], key: Tuple, server_url: str,
+                 container_name: str, is_swarm: bool, replay_size: int,
+                 resume: Optional[LogResumeFilter] = None, limits: Optional[StreamBufferLimits] = None):
+        self.registry = registry
+        self.limits = limits or StreamBufferLimits()
+        self.key = key
+        self.server_url = server_url
+        self.container_name = container_name
+        self.is_swarm = is_swarm
+        self.replay_size = replay_size
+        self.replay = deque()
+        self.resume = resume
+        self.closed = False
+        self._subscribers = set()
+        self._lock = RLock()
+        self._reader = None
+        self._client = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def try_subscribe(self, tail: Union[int, str]) -> Optional[LogSubscription]:
+        with self._lock:
+            if self.closed:
+                return None
+
+            if self._reader is None:
+                # The first subscriber decides how much history the upstream stream starts with
+                subscription = LogSubscription(self, self.limits)
+                self._subscribers.add(subscription)
+                self._reader = gevent.spawn(self._read, tail)
+                return subscription
+
+            if tail > len(self.replay):
+                return None
+
+            subscription = LogSubscription(self, self.limits)
+            if tail > 0:
+                for line in list(self.replay)[-tail:]:
+                    subscription.put(('log', line), block=False)
+            self._subscribers.add(subscription)
+            return subscription
+
+    def try_resume(self, resume: LogResumeFilter) -> Optional[LogSubscription]:
+        with self._lock:
+            if self.closed or self._reader is None:
+                return None
+
+            replay = list(self.replay)
+            # Every line at the cursor timestamp must still be in the replay buffer
+            if not replay or replay[0].timestamp is None or replay[0].timestamp >= resume.timestamp:
+                return None
+
+            at_cursor = [i for i, line in enumerate(replay) if line.timestamp == resume.timestamp]
+            if len(at_cursor) < resume.offset or not resume.offset:
+                return None
+            position = at_cursor[resume.offset - 1]
+            if log_line_hash(replay[position]) != resume.hash:
+                return None
+
+            subscription = LogSubscription(self, self.limits)
+            for line in replay[position + 1:]:
+                subscription.put(('log', line), block=False)
+            self._subscribers.add(subscription)
+            return subscription
+
+    def _forget_oldest(self):
+        size = len(self.replay.popleft().data)
+        self.limits.release(size)
+        self.limits.replay_bytes -= size
+
+    def _remember(self, line: LogLine):
+        """Keeps ``line`` for late subscribers, within both the ring length and the worker's byte budget."""
+        if not self.replay_size or self.closed:
+            return
+        if len(self.replay) >= self.replay_size:
+            self._forget_oldest()
+        size = len(line.data)
+        # Rings together may fill half of the byte budget, the rest stays for consumer queues. Over it a
+        # ring gives up its own oldest lines; one that cannot fit skips the line, and subscribers asking
+        # for more history than the ring holds get a private stream
+        while (self.limits.replay_bytes + size > self.limits.max_bytes // 2
+               or self.limits.buffered_bytes + size > self.limits.max_bytes):
+            if not self.replay:
+                return
+            self._forget_oldest()
+        self.limits.reserve(size, force=True)
+        self.limits.replay_bytes += size
+        self.replay.append(line)
+
+    def _broadcast(self, message: Tuple[str, Optional[str]]):
+        for subscription in list(self._subscribers):
+            subscription.put(message)
+
+    def _read(self, tail: Union[int, str]):
+        stream_func = stream_service_logs if self.is_swarm else stream_container_logs
+        try:
+            self._client = create_streaming_client(self.server_url)
+            if self.resume is None:
+                for log_line in stream_func(self._client, self.container_name, tail):
+                    log_line = _detached(log_line)
+                    self._remember(log_line)
+                    self._broadcast(('log', log_line))
+            else:
+                for log_line in stream_func(self._client, self.container_name, since=self.resume.since):
+                    for resumed_line in self.resume.feed(log_line):
+                        self._broadcast(('log', _detached(resumed_line)))
+                for resumed_line in self.resume.flush():
+                    self._broadcast(('log', _detached(resumed_line)))
+            self._broadcast(('end', None))
+        except gevent.GreenletExit:
+            raise
+        except Exception as e:
+            self._broadcast(('error', str(e)))
+        finally:
+            self._shutdown()
+
+    def unsubscribe(self, subscription: LogSubscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+            if self._subscribers or self.closed:
+                return
+            reader = self._reader
+
+        self._shutdown()
+        if reader is not None and reader is not gevent.getcurrent():
+            reader.kill(block=False)
+
+    def _shutdown(self):
+        with self._lock:
+            self.closed = True
+            client, self._client = self._client, None
+            while self.replay:
+                self._forget_oldest()
+
+        if self.registry is not None:
+            self.registry.discard(self)
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+        logger.debug(f"Closed upstream log stream for {self.container_name}")
+
+
+class LogStreamRegistry:
+    def __init__(self, replay_size: int = 1000, limits: Optional[StreamBufferLimits] = None):
+        self.replay_size = replay_size
+        self.limits = limits or StreamBufferLimits()
+        self._hubs: Dict[Tuple, LogStreamHub] = {}
+        self._lock = RLock()
+
+    def subscribe(self, server_url: str, container_name: str, is_swarm: bool, tail: Union[int, str],
+                  resume: Optional[LogResumeFilter] = None) -> LogSubscription:
+        """``tail`` is a line count or 'all' for the container's whole history."""
+        key = (server_url, container_name, bool(is_swarm))
+        if tail != 'all':
+            tail = max(0, int(tail))
+
+        if resume is not None:
+            with self._lock:
+                hub = self._hubs.get(key)
+                subscription = hub.try_resume(resume) if hub is not None else None
+            if subscription is not None:
+                return subscription
+            # Resume upstream from the cursor timestamp on a stream of its own
+            private_hub = LogStreamHub(None, key, server_url, container_name, is_swarm, 0, resume, self.limits)
+            return private_hub.try_subscribe(0)
+
+        if tail != 'all' and tail <= self.replay_size:
+            with self._lock:
+                hub = self._hubs.get(key)
+                if hub is None or hub.closed:
+                    hub = LogStreamHub(self, key, server_url, container_name, is_swarm, self.replay_size,
+                                       limits=self.limits)
+                    self._hubs[key] = hub
+                subscription = hub.try_subscribe(tail)
+            if subscription is not None:
+                return subscription
+
+        # The shared replay buffer cannot cover the requested tail, use a private upstream stream
+        private_hub = LogStreamHub(None, key, server_url, container_name, is_swarm, 0, limits=self.limits)
+        return private_hub.try_subscribe(tail)
+
+    def configure(self, max_queue_lines: int, max_bytes: int, policy: str):
+        self.limits.max_queue_lines = max(self.replay_size, max_queue_lines)
+        self.limits.max_bytes = max_bytes
+        self.limits.policy = policy if policy in SLOW_CONSUMER_POLICIES else 'drop'
+
+    def discard(self, hub: LogStreamHub):
+        with self._lock:
+            if self._hubs.get(hub.key) is hub:
+                del self._hubs[hub.key]
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            hubs = list(self._hubs.values())
+        return {
+            "shared_streams": len(hubs),
+            "subscribers": sum(hub.subscriber_count for hub in hubs),
+            "buffers": self.limits.get_stats()
+        }
+
+
+log_stream_registry = LogStreamRegistry()
@@ -0,0 +1,195 @@
+import json
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Union
+
+from .logs_manager import classify_log_level, strip_log_timestamp
+
+LEVEL_ORDER = {'trace': 0, 'debug': 1, 'info': 2, 'warn': 3, 'error': 4, 'fatal': 5}
+
+LEVEL_ALIASES = {
+    'trace': 'trace', 'trc': 'trace',
+    'debug': 'debug', 'dbg': 'debug',
+    'info': 'info', 'inf': 'info', 'information': 'info', 'notice': 'info',
+    'warn': 'warn', 'warning': 'warn', 'wrn': 'warn',
+    'error': 'error', 'err': 'error', 'erro': 'error',
+    'fatal': 'fatal', 'critical': 'fatal', 'crit': 'fatal', 'panic': 'fatal', 'emerg': 'fatal', 'alert': 'fatal',
+}
+
+# Numeric levels as written by pino / bunyan
+NUMERIC_LEVELS = ((60, 'fatal'), (50, 'error'), (40, 'warn'), (30, 'info'), (20, 'debug'), (10, 'trace'))
+
+FIELD_KEYS = {
+    'level': ('level', 'lvl', 'severity', 'levelname', 'log.level', 'loglevel'),
+    'msg': ('msg', 'message', 'event', 'log'),
+    'trace_id': ('trace_id', 'traceId', 'traceID', 'trace.id', 'traceid', 'dd.trace_id'),
+}
+
+LOGFMT_PAIR_PATTERN = re.compile(rb'([\w.\-]+)=("(?:[^"\\]|\\.)*"|\S*)')
+FILTER_PATTERN = re.compile(r'^([\w.\-]+)\s*(>=|<=|!=|!~|=|~|>|<)\s*(.*)$')
+SWARM_DETAILS_PREFIX = b'com.docker.swarm.'
+
+
+class LogFields(NamedTuple):
+    format: Optional[str]
+    level: Optional[str]
+    msg: Optional[str]
+    trace_id: Optional[str]
+    fields: Dict
+
+    def get(self, name: str):
+        if name in ('level', 'msg', 'trace_id'):
+            return getattr(self, name)
+        return self.fields.get(name)
+
+    def to_dict(self) -> Dict:
+        return {k: v for k, v in (('format', self.format), ('level', self.level),
+                                  ('msg', self.msg), ('trace_id', self.trace_id)) if v is not None}
+
+
+def normalize_level(value) -> Optional[str]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        for threshold, name in NUMERIC_LEVELS:
+            if value >= threshold:
+                return name
+        return 'trace'
+    return LEVEL_ALIASES.get(str(value).strip().lower())
+
+
+def _is_scalar(value) -> bool:
+    return isinstance(value, (str, int, float)) and not isinstance(value, bool)
+
+
+def _lookup(fields: Dict, keys) -> Optional[Union[str, int, float]]:
+    # Objects and lists are skipped so their repr never ends up as a msg or level
+    for key in keys:
+        if _is_scalar(fields.get(key)):
+            return fields[key]
+        # Nested objects such as {"log": {"level": "info"}}
+        if '.' in key:
+            head, _, tail = key.partition('.')
+            nested = fields.get(head)
+            if isinstance(nested, dict) and _is_scalar(nested.get(tail)):
+                return nested[tail]
+    return None
+
+
+def _parse_json(body: bytes) -> Optional[Dict]:
+    if not body.startswith(b'{'):
+        return None
+    try:
+        fields = json.loads(body)
+    except ValueError:
+        return None
+    return fields if isinstance(fields, dict) else None
+
+
+def _parse_logfmt(body: bytes) -> Optional[Dict]:
+    pairs = LOGFMT_PAIR_PATTERN.findall(body)
+    # Require the line to start with a pair so prose containing "a=b" is not mistaken for logfmt
+    if len(pairs) < 2 or not body.startswith(pairs[0][0] + b'='):
+        return None
+    fields = {}
+    for key, value in pairs:
+        if value.startswith(b'"') and value.endswith(b'"') and len(value) >= 2:
+            value = value[1:-1].replace(b'\\"', b'"')
+        fields[key.decode('utf-8', 'replace')] = value.decode('utf-8', 'replace')
+    return fields
+
+
+def parse_log_fields(line: bytes) -> LogFields:
+    body = bytes(strip_log_timestamp(line)).rstrip(b'\r\n')
+    if body.startswith(SWARM_DETAILS_PREFIX):
+        body = body.partition(b' ')[2]
+
+    fields, log_format = _parse_json(body), 'json'
+    if fields is None:
+        fields, log_format = _parse_logfmt(body), 'logfmt'
+
+    if fields is None:
+        return LogFields(None, classify_log_level(body), None, None, {})
+
+    level = normalize_level(_lookup(fields, FIELD_KEYS['level'])) or classify_log_level(body)
+    msg = _lookup(fields, FIELD_KEYS['msg'])
+    trace_id = _lookup(fields, FIELD_KEYS['trace_id'])
+    return LogFields(
+        log_format,
+        level,
+        str(msg) if msg is not None else None,
+        str(trace_id) if trace_id is not None else None,
+        fields
+    )
+
+
+def _compare(op: str, actual, expected: str, ordinal: Optional[Callable] = None) -> bool:
+    if actual is None:
+        return op in ('!=', '!~')
+
+    if op in ('~', '!~'):
+        found = expected.lower() in str(actual).lower()
+        return found if op == '~' else not found
+
+    if ordinal is not None:
+        left, right = ordinal(actual), ordinal(expected)
+    else:
+        try:
+            left, right = float(actual), float(expected)
+        except (TypeError, ValueError):
+            left, right = str(actual), expected
+
+    if left is None or right is None:
+        return op == '!='
+    return {
+        '=': left == right,
+        '!=': left != right,
+        '>': left > right,
+        '>=': left >= right,
+        '<': left < right,
+        '<=': left <= right,
+    }[op]
+
+
+def _level_ordinal(value) -> Optional[int]:
+    level = normalize_level(value)
+    return LEVEL_ORDER.get(level) if level else None
+
+
+class LogFieldFilter:
+    """Conditions such as ``level>=warn trace_id=abc msg~timeout``, all of which must hold.
+
+    Supported operators are ``= != > >= < <=`` and ``~`` / ``!~`` for substring
+    (not) contained. Levels compare by severity, other fields numerically when
+    both sides are numbers.
+    """
+
+    def __init__(self, conditions: List[tuple]):
+        self.conditions = conditions
+
+    @classmethod
+    def parse(cls, expression: Union[str, List[str], None]) -> Optional['LogFieldFilter']:
+        if not expression:
+            return None
+        if isinstance(expression, str):
+            terms = expression.split()
+        elif isinstance(expression, list) and all(isinstance(term, str) for term in expression):
+            terms = expression
+        else:
+            raise ValueError("filter must be a string or a list of strings")
+        conditions = []
+        for term in terms:
+            match = FILTER_PATTERN.match(term.strip())
+            if not match:
+                raise ValueError(f"Invalid filter condition: {term}")
+            field, op, value = match.groups()
+            if field == 'level' and op not in ('~', '!~') and normalize_level(value) is None:
+                raise ValueError(f"Unknown log level: {value}")
+            conditions.append((field, op, value.strip('"')))
+        return cls(conditions)
+
+    def matches(self, fields: LogFields) -> bool:
+        for field, op, value in self.conditions:
+            ordinal = _level_ordinal if field == 'level' else None
+            if not _compare(op, fields.get(field), value, ordinal):
+                return False
+        return True
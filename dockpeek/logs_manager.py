@@ -1,8 +1,331 @@
+import re
+import math
+import time
+import zlib
 import logging
+import calendar
+from collections import deque
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
 from flask import current_app
 
 logger = logging.getLogger(__name__)
 
+LOG_TIMESTAMP_PATTERN = re.compile(rb'^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,9}))?Z ')
+
+# Same precedence as the colouring in logs-viewer.js
+LOG_LEVEL_PATTERNS = (
+    ('error', re.compile(rb'\b(ERROR|ERR|ERRO)\b|\[(ERROR|ERR|ERRO)\]', re.IGNORECASE)),
+    ('warn', re.compile(rb'\b(WARN|WARNING)\b|\[(WARN|WARNING)\]', re.IGNORECASE)),
+    ('info', re.compile(rb'\b(INFO)\b|\[(INFO)\]', re.IGNORECASE)),
+    ('debug', re.compile(rb'\b(DEBUG|TRACE)\b|\[(DEBUG|TRACE)\]', re.IGNORECASE)),
+)
+
+STREAM_HEADER_SIZE = 8
+STREAM_NAMES = {0: 'stdin', 1: 'stdout', 2: 'stderr'}
+RAW_READ_SIZE = 64 * 1024
+
+# Successively wider look-back windows (seconds) used when paging backwards
+BACKWARD_WINDOWS = (300, 3600, 6 * 3600, 86400, 7 * 86400, 30 * 86400)
+MAX_PAGE_SIZE = 10000
+
+# User regexes run in the worker's event loop, which Python cannot interrupt mid-match.
+# Patterns are kept short, quantified groups holding a quantifier (the usual catastrophic
+# backtracking shape) are refused, and a search gives up after SEARCH_TIME_LIMIT seconds.
+MAX_SEARCH_PATTERN_LENGTH = 256
+NESTED_QUANTIFIER_PATTERN = re.compile(r'\([^()]*(?:[*+]|\{\d*,\d*\})[^()]*\)(?:[*+]|\{\d*,\d*\})')
+SEARCH_TIME_LIMIT = 30
+# Only the start of very long lines is matched against a regex
+MAX_SEARCH_LINE_BYTES = 16 * 1024
+SEARCH_YIELD_EVERY = 1000
+
+
+def parse_log_timestamp(line: bytes) -> Optional[Tuple[int, int]]:
+    match = LOG_TIMESTAMP_PATTERN.match(line)
+    if not match:
+        return None
+    year, month, day, hour, minute, second, fraction = match.groups()
+    seconds = calendar.timegm((int(year), int(month), int(day), int(hour), int(minute), int(second)))
+    nanos = int(fraction.ljust(9, b'0')) if fraction else 0
+    return seconds, nanos
+
+
+def format_log_timestamp(ts: Tuple[int, int]) -> str:
+    seconds, nanos = ts
+    base = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))
+    return f"{base}.{nanos:09d}Z"
+
+
+def parse_cursor_timestamp(value) -> Optional[Tuple[int, int]]:
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        seconds = math.floor(value)
+        return int(seconds), int(round((value - seconds) * 1e9))
+    return parse_log_timestamp(f"{value} ".encode())
+
+
+class LogLine(NamedTuple):
+    stream: str
+    timestamp: Optional[Tuple[int, int]]
+    data: Union[bytes, memoryview]
+
+    def text(self) -> str:
+        return str(self.data, 'utf-8', 'replace')
+
+
+class LogLineSplitter:
+    # Frames of different streams interleave, so partial lines are kept per stream
+    def __init__(self):
+        self._pending: Dict[str, bytearray] = {}
+
+    def feed(self, stream: str, payload: bytes) -> Iterator[LogLine]:
+        view = memoryview(payload)
+        start = 0
+        while True:
+            end = payload.find(b'\n', start)
+            if end == -1:
+                break
+            pending = self._pending.pop(stream, None)
+            if pending is not None:
+                pending += view[start:end + 1]
+                line = bytes(pending)
+            else:
+                line = view[start:end + 1]
+            yield LogLine(stream, parse_log_timestamp(line), line)
+            start = end + 1
+
+        if start < len(payload):
+            self._pending.setdefault(stream, bytearray()).extend(view[start:])
+
+    def flush(self) -> Iterator[LogLine]:
+        for stream, pending in self._pending.items():
+            line = bytes(pending)
+            yield LogLine(stream, parse_log_timestamp(line), line)
+        self._pending.clear()
+
+
+class RawLogStream:
+    """Iterates the Engine log response frame by frame, straight from the HTTP body."""
+
+    def __init__(self, response, tty: bool):
+        self.response = response
+        self.tty = tty
+
+    def __iter__(self) -> Iterator[LogLine]:
+        splitter = LogLineSplitter()
+        raw = self.response.raw
+
+        if self.tty:
+            for chunk in raw.stream(RAW_READ_SIZE, decode_content=False):
+                yield from splitter.feed('stdout', chunk)
+        else:
+            while True:
+                header = raw.read(STREAM_HEADER_SIZE)
+                if len(header) < STREAM_HEADER_SIZE:
+                    break
+                length = int.from_bytes(header[4:8], 'big')
+                if not length:
+                    continue
+                payload = raw.read(length)
+                if not payload:
+                    break
+                yield from splitter.feed(STREAM_NAMES.get(header[0], 'stdout'), payload)
+
+        yield from splitter.flush()
+
+    def close(self):
+        try:
+            self.response.close()
+        except Exception:
+            pass
+
+
+def open_log_stream(client, name, is_swarm=False, since=None, until=None, tail='all', follow=False) -> RawLogStream:
+    api = client.api
+    params = {
+        'stdout': 1,
+        'stderr': 1,
+        'timestamps': 1,
+        'follow': 1 if follow else 0,
+        'tail': tail
+    }
+    if since is not None:
+        params['since'] = since
+
+    if is_swarm:
+        service = api.inspect_service(name)
+        tty = service.get('Spec', {}).get('TaskTemplate', {}).get('ContainerSpec', {}).get('TTY', False)
+        params['details'] = 1
+        url = api._url('/services/{0}/logs', service['ID'])
+    else:
+        container = api.inspect_container(name)
+        tty = container.get('Config', {}).get('Tty', False)
+        if until is not None:
+            params['until'] = until
+        url = api._url('/containers/{0}/logs', container['Id'])
+
+    response = api._get(url, params=params, stream=True)
+    api._raise_for_status(response)
+    if follow:
+        # Idle containers must not trip the client read timeout
+        api._disable_socket_timeout(api._get_raw_response_socket(response))
+    return RawLogStream(response, tty)
+
+
+def scan_log_lines(client, name, is_swarm=False, since: Optional[Tuple[int, int]] = None,
+                   until: Optional[Tuple[int, int]] = None, tail='all') -> Iterator[LogLine]:
+    log_stream = open_log_stream(
+        client, name, is_swarm,
+        since=since[0] if since and since[0] > 0 else None,
+        until=until[0] + 1 if until else None,
+        tail=tail
+    )
+    try:
+        for line in log_stream:
+            ts = line.timestamp
+            if ts is None:
+                continue
+            if since and ts < since:
+                continue
+            if until and ts > until:
+                # Service logs interleave tasks, so only container logs are ordered
+                if is_swarm:
+                    continue
+                break
+            yield line
+    finally:
+        log_stream.close()
+
+
+def stream_log_lines(client, name, is_swarm=False, tail=100, since: Optional[int] = None) -> Iterator[LogLine]:
+    log_stream = open_log_stream(client, name, is_swarm, since=since, tail='all' if since else tail, follow=True)
+    try:
+        yield from log_stream
+    finally:
+        log_stream.close()
+
+
+def log_line_hash(line: LogLine) -> str:
+    return f"{zlib.crc32(line.data):08x}"
+
+
+class LogCursorTracker:
+    """Tracks the resume cursor of a stream: last timestamp, lines seen at it and the last line's hash."""
+
+    def __init__(self):
+        self.timestamp: Optional[Tuple[int, int]] = None
+        self.offset = 0
+        self.hash = None
+
+    def update(self, lines: List[LogLine]):
+        for line in lines:
+            # Interleaved stdout and stderr can deliver an older line late; the cursor never moves back
+            if line.timestamp is None or (self.timestamp is not None and line.timestamp < self.timestamp):
+                continue
+            if line.timestamp == self.timestamp:
+                self.offset += 1
+            else:
+                self.timestamp = line.timestamp
+                self.offset = 1
+            self.hash = log_line_hash(line)
+
+    @property
+    def cursor(self) -> Optional[Dict]:
+        if self.timestamp is None:
+            return None
+        return {
+            'timestamp': format_log_timestamp(self.timestamp),
+            'offset': self.offset,
+            'hash': self.hash
+        }
+
+
+class LogResumeFilter:
+    """Drops the lines a reconnecting client already has, given its resume cursor.
+
+    The daemon only filters ``since`` by whole seconds, so lines up to the cursor
+    timestamp arrive again. Lines at the cursor timestamp are matched by position
+    and hash; if the cursor line cannot be found they are all resent, since a
+    duplicate is better than a gap.
+    """
+
+    def __init__(self, timestamp: Tuple[int, int], offset: int, line_hash: Optional[str]):
+        self.timestamp = timestamp
+        self.offset = max(0, offset)
+        self.hash = line_hash
+        self.pending: List[LogLine] = []
+        self.passing = False
+
+    @classmethod
+    def from_cursor(cls, cursor: Optional[Dict]) -> Optional['LogResumeFilter']:
+        """Raises ValueError when the cursor does not have the shape LogCursorTracker produces."""
+        if not cursor:
+            return None
+        if not isinstance(cursor, dict):
+            raise ValueError("resume must be a cursor object")
+        value = cursor.get('timestamp')
+        if isinstance(value, bool) or not isinstance(value, (str, int, float, type(None))):
+            raise ValueError("Invalid resume timestamp")
+        try:
+            timestamp = parse_cursor_timestamp(value)
+        except (OverflowError, ValueError):
+            raise ValueError("Invalid resume timestamp")
+        if timestamp is None:
+            if value not in (None, ''):
+                raise ValueError("Invalid resume timestamp")
+            return None
+
+        offset = cursor.get('offset', 0) or 0
+        line_hash = cursor.get('hash')
+        if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+            raise ValueError("resume offset must be a non-negative integer")
+        if line_hash is not None and not isinstance(line_hash, str):
+            raise ValueError("resume hash must be a string")
+        return cls(timestamp, offset, line_hash)
+
+    @property
+    def since(self) -> int:
+        return self.timestamp[0]
+
+    def _release(self) -> List[LogLine]:
+        self.passing = True
+        pending, self.pending = self.pending, []
+        matches = [i for i, line in enumerate(pending) if log_line_hash(line) == self.hash]
+        if self.offset and self.offset - 1 in matches:
+            return pending[self.offset:]
+        if matches:
+            return pending[matches[-1] + 1:]
+        return pending
+
+    def feed(self, line: LogLine) -> List[LogLine]:
+        if self.passing or line.timestamp is None:
+            return [line]
+        if line.timestamp < self.timestamp:
+            return []
+        if line.timestamp == self.timestamp:
+            self.pending.append(line)
+            # The expected cursor line is confirmed, no need to wait for a newer line
+            if len(self.pending) == self.offset and log_line_hash(line) == self.hash:
+                self.pending = []
+                self.passing = True
+            return []
+        return self._release() + [line]
+
+    def flush(self) -> List[LogLine]:
+        return [] if self.passing else self._release()
+
+
+def classify_log_level(text: bytes) -> Optional[str]:
+    for level, pattern in LOG_LEVEL_PATTERNS:
+        if pattern.search(text):
+            return level
+    return None
+
+
+def strip_log_timestamp(line):
+    match = LOG_TIMESTAMP_PATTERN.match(line)
+    return line[match.end():] if match else line
+
 def get_service_logs(client, service_name, tail=500, timestamps=True, follow=False):
     try:
         service = client.services.get(service_name)
@@ -38,25 +361,12 @@ def get_service_logs(client, service_name, tail=500, timestamps=True, follow=Fal
         }
 
 
-def stream_service_logs(client, service_name, tail=100):
-    service = None
+def stream_service_logs(client, service_name, tail=100, since=None):
     try:
-        service = client.services.get(service_name)
-        log_generator = service.logs(
-            tail=tail,
-            timestamps=True,
-            follow=True,
-            stdout=True,
-            stderr=True,
-            details=True
-        )
-        
-        for log_line in log_generator:
-            yield log_line.decode('utf-8', errors='replace')
-            
+        yield from stream_log_lines(client, service_name, True, tail, since)
     except Exception as e:
         logger.error(f"Error streaming logs for service {service_name}: {e}")
-        yield f"Error: {str(e)}\n"
+        yield LogLine('stderr', None, f"Error: {str(e)}\n".encode())
 
 def get_container_logs(client, container_name, tail=500, timestamps=True, follow=False):
     try:
@@ -87,27 +397,228 @@ def get_container_logs(client, container_name, tail=500, timestamps=True, follow
         }
 
 
-def stream_container_logs(client, container_name, tail=100):
-    container = None
-    log_stream = None
+def stream_container_logs(client, container_name, tail=100, since=None):
     try:
-        container = client.containers.get(container_name)
-        log_stream = container.logs(
-            tail=tail,
-            timestamps=True,
-            follow=True,
-            stream=True
-        )
-        
-        for log_line in log_stream:
-            yield log_line.decode('utf-8', errors='replace')
-            
+        yield from stream_log_lines(client, container_name, False, tail, since)
     except Exception as e:
         logger.error(f"Error streaming logs for {container_name}: {e}")
-        yield f"Error: {str(e)}\n"
-    finally:
-        if log_stream:
-            try:
-                log_stream.close()
-            except:
-                pass
+        yield LogLine('stderr', None, f"Error: {str(e)}\n".encode())
+
+
+class LogPager:
+    def __init__(self, client, name, is_swarm=False, page_size=500,
+                 since: Optional[Tuple[int, int]] = None, until: Optional[Tuple[int, int]] = None):
+        self.client = client
+        self.name = name
+        self.is_swarm = is_swarm
+        self.page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+        self.since = since
+        self.until = until
+
+    def _scan(self, since: Optional[Tuple[int, int]], until: Optional[Tuple[int, int]], tail='all') -> Iterator[LogLine]:
+        return scan_log_lines(self.client, self.name, self.is_swarm, since, until, tail)
+
+    def _result(self, entries, has_more, cursor_ts, cursor_offset):
+        return {
+            'success': True,
+            'container_name': self.name,
+            'logs': b''.join(line.data for line in entries).decode('utf-8', errors='replace'),
+            'lines': len(entries),
+            'has_more': has_more,
+            'cursor': {
+                'timestamp': format_log_timestamp(cursor_ts),
+                'offset': cursor_offset
+            } if cursor_ts else None
+        }
+
+    def forward(self, cursor: Optional[Tuple[int, int]] = None, offset: int = 0) -> Dict:
+        lower = max(filter(None, [cursor, self.since]), default=None)
+        entries = []
+        has_more = False
+        skipped_at_cursor = 0
+
+        for line in self._scan(lower, self.until):
+            if cursor and line.timestamp == cursor and skipped_at_cursor < offset:
+                skipped_at_cursor += 1
+                continue
+            if len(entries) == self.page_size:
+                has_more = True
+                break
+            entries.append(line)
+
+        if not entries:
+            return self._result(entries, False, cursor, offset)
+
+        last_ts = entries[-1].timestamp
+        last_offset = sum(1 for line in entries if line.timestamp == last_ts)
+        if cursor and last_ts == cursor:
+            last_offset += offset
+        return self._result(entries, has_more, last_ts, last_offset)
+
+    def _collect_before(self, lower, upper, offset) -> deque:
+        # Keep one page plus the lines at the cursor that were already delivered
+        window = deque(maxlen=self.page_size + offset + 1)
+        window.extend(self._scan(lower, upper))
+
+        dropped = 0
+        while window and dropped < offset and window[-1].timestamp == upper:
+            window.pop()
+            dropped += 1
+        return window
+
+    def backward(self, cursor: Optional[Tuple[int, int]] = None, offset: int = 0) -> Dict:
+        upper = cursor or self.until
+
+        if upper is None:
+            entries = list(self._scan(self.since, None, tail=self.page_size + 1))
+            has_more = len(entries) > self.page_size
+        else:
+            entries = []
+            has_more = False
+            for window_seconds in BACKWARD_WINDOWS + (None,):
+                lower = (upper[0] - window_seconds, 0) if window_seconds else None
+                if self.since and (lower is None or lower < self.since):
+                    lower = self.since
+                window = self._collect_before(lower, upper, offset)
+                if len(window) > self.page_size:
+                    entries, has_more = list(window), True
+                    break
+                entries = list(window)
+                if lower is None or lower == self.since:
+                    break
+
+        entries = entries[-self.page_size:]
+        if not entries:
+            return self._result(entries, False, cursor, offset)
+
+        first_ts = entries[0].timestamp
+        first_offset = sum(1 for line in entries if line.timestamp == first_ts)
+        if cursor and first_ts == cursor:
+            first_offset += offset
+        return self._result(entries, has_more, first_ts, first_offset)
+
+
+def get_logs_page(client, name, is_swarm=False, page_size=500, cursor=None,
+                  direction='backward', since=None, until=None):
+    try:
+        cursor = cursor or {}
+        pager = LogPager(
+            client, name, is_swarm, page_size,
+            since=parse_cursor_timestamp(since),
+            until=parse_cursor_timestamp(until)
+        )
+        cursor_ts = parse_cursor_timestamp(cursor.get('timestamp'))
+        cursor_offset = int(cursor.get('offset', 0) or 0) if cursor_ts else 0
+
+        if direction == 'forward':
+            return pager.forward(cursor_ts, cursor_offset)
+        return pager.backward(cursor_ts, cursor_offset)
+
+    except Exception as e:
+        logger.error(f"Error fetching log page for {name}: {e}")
+        return {
+            'success': False,
+            'error': str(e),
+            'container_name': name
+        }
+
+
+class LogSearch:
+    def __init__(self, query: str, regex: bool = False, case_sensitive: bool = False,
+                 levels: Optional[List[str]] = None, context: int = 2, limit: int = 200):
+        """Raises ValueError on a non-integer context or limit or a refused pattern, re.error on an invalid one."""
+        self.levels = set(levels) if levels else None
+        try:
+            self.context = max(0, min(int(context), 50))
+            self.limit = max(1, min(int(limit), 5000))
+        except (TypeError, ValueError):
+            raise ValueError("context and limit must be integers")
+        query = query or ''
+        self.regex = bool(query) and regex
+
+        if len(query) > MAX_SEARCH_PATTERN_LENGTH:
+            raise ValueError(f"Search query is limited to {MAX_SEARCH_PATTERN_LENGTH} characters")
+        if not query:
+            self.pattern = None
+        elif regex:
+            if NESTED_QUANTIFIER_PATTERN.search(query):
+                raise ValueError("Nested quantifiers such as (a+)+ are not supported")
+            flags = 0 if case_sensitive else re.IGNORECASE
+            self.pattern = re.compile(query.encode('utf-8'), flags)
+        else:
+            flags = 0 if case_sensitive else re.IGNORECASE
+            self.pattern = re.compile(re.escape(query.encode('utf-8')), flags)
+
+    def matches(self, text: bytes) -> Tuple[bool, Optional[str]]:
+        level = classify_log_level(text) if self.levels else None
+        if self.levels and level not in self.levels:
+            return False, level
+        if self.pattern and not self.pattern.search(text, 0, MAX_SEARCH_LINE_BYTES if self.regex else len(text)):
+            return False, level
+        return True, level
+
+    def run(self, lines: Iterator[LogLine]) -> Iterator[Dict]:
+        before = deque(maxlen=self.context)
+        after_remaining = 0
+        last_emitted = -1
+        match_count = 0
+        scanned = 0
+        truncated = False
+        timed_out = False
+        deadline = time.monotonic() + SEARCH_TIME_LIMIT
+
+        for index, line in enumerate(lines):
+            scanned += 1
+            if not scanned % SEARCH_YIELD_EVERY:
+                if time.monotonic() > deadline:
+                    truncated = timed_out = True
+                    break
+                # Lets other streams in this worker run during a long scan
+                time.sleep(0)
+
+            if match_count >= self.limit:
+                if after_remaining == 0:
+                    truncated = True
+                    break
+
+            text = strip_log_timestamp(line.data)
+            is_match, level = self.matches(text) if match_count < self.limit else (False, None)
+
+            if is_match:
+                first_index = before[0][0] if before else index
+                if last_emitted >= 0 and first_index > last_emitted + 1:
+                    yield {'gap': True}
+                for _, context_line in before:
+                    yield {'line': context_line.text(), 'stream': context_line.stream, 'context': True}
+                before.clear()
+
+                match_count += 1
+                last_emitted = index
+                after_remaining = self.context
+                yield {
+                    'line': line.text(),
+                    'stream': line.stream,
+                    'match': True,
+                    'level': level or classify_log_level(text)
+                }
+            elif after_remaining > 0:
+                after_remaining -= 1
+                last_emitted = index
+                yield {'line': line.text(), 'stream': line.stream, 'context': True}
+            elif self.context:
+                before.append((index, line))
+
+        yield {'done': True, 'matches': match_count, 'scanned': scanned, 'truncated': truncated, 'timed_out': timed_out}
+
+
+def search_logs(client, name, search: LogSearch, is_swarm=False, since=None, until=None) -> Iterator[Dict]:
+    try:
+        lines = scan_log_lines(
+            client, name, is_swarm,
+            since=parse_cursor_timestamp(since),
+            until=parse_cursor_timestamp(until)
+        )
+        yield from search.run(lines)
+    except Exception as e:
+        logger.error(f"Error searching logs for {name}: {e}")
+        yield {'error': str(e)}
@@ -1,8 +1,8 @@
+import re
 import json
 from datetime import datetime
 from functools import wraps
 
-import docker
 from flask import Blueprint, render_template, jsonify, request, current_app, make_response, Response
 from flask_login import login_required, current_user
 
@@ -10,23 +10,47 @@ from .get_data import get_all_data
 from .update_manager import update_container
 from .docker_utils import discover_docker_clients, create_streaming_client, DockerClientFactory, get_container_status_with_exit_code
 from .update import update_checker
-from .logs_manager import get_container_logs, stream_container_logs, get_service_logs, stream_service_logs
+from .logs_manager import get_container_logs, get_service_logs, get_logs_page, LogSearch, search_logs
+from .prune_manager import prune_planner, prune_executor, prune_plans
+from .disk_usage import disk_usage_cache
+from .api_tokens import api_tokens
+from .columnar import to_columnar
+from .etags import compute_etag, json_snapshot, not_modified, snapshot_response, with_etag
+from .coalesce import request_coalescer
+from .data_query import ContainerQuery, apply_query
+from .search_index import search_index, MAX_AGE_SECONDS as SEARCH_INDEX_MAX_AGE
+from .container_details import container_detail_cache, build_container_details
 
 
 main_bp = Blueprint('main', __name__)
 
 
-def conditional_login_required(f):
-    """Dekorator który wymaga logowania tylko gdy autoryzacja nie jest wyłączona."""
+def conditional_login_required(f=None, scope=None):
+    """Dekorator który wymaga logowania tylko gdy autoryzacja nie jest wyłączona.
+
+    Endpoints given a ``scope`` also accept an API bearer token carrying that scope.
+    """
+    if f is None:
+        return lambda func: conditional_login_required(func, scope)
+
     @wraps(f)
     def decorated_function(*args, **kwargs):
         if current_app.config.get('DISABLE_AUTH', False):
             return f(*args, **kwargs)
-        else:
-            from flask_login import current_user
-            if not current_user.is_authenticated:
-                return current_app.login_manager.unauthorized()
+
+        auth_header = request.headers.get('Authorization', '')
+        if auth_header[:7].lower() == 'bearer ':
+            if scope is None:
+                return jsonify({"error": "API tokens are not accepted for this endpoint"}), 403
+            refusal = api_tokens.authorize(current_app.config.get('API_TOKEN_SECRET'), auth_header[7:].strip(), scope)
+            if refusal:
+                return jsonify({"error": refusal}), 401
             return f(*args, **kwargs)
+
+        from flask_login import current_user
+        if not current_user.is_authenticated:
+            return current_app.login_manager.unauthorized()
+        return f(*args, **kwargs)
     return decorated_function
 
 @main_bp.route("/")
@@ -49,13 +73,99 @@ def get_registry_templates():
     from flask import current_app, jsonify
     return jsonify(current_app.config.get("CUSTOM_REGISTRY_TEMPLATES", {}))
 
+def _data_snapshot():
+    return json_snapshot(get_all_data())
+
+def _coalesced_data():
+    # Port links are built from the request hostname, so it is part of the key
+    snapshot = request_coalescer.run(('data', request.host.split(':')[0]), _data_snapshot)
+    search_index.update(snapshot.data.get('containers', []))
+    container_detail_cache.observe(snapshot.data.get('containers', []))
+    return snapshot
+
+def _refresh_search_index_later():
+    import gevent
+    app = current_app._get_current_object()
+
+    def refresh():
+        with app.app_context():
+            request_coalescer.run(('search-index',), lambda: search_index.update(get_all_data().get('containers', [])))
+
+    gevent.spawn(refresh)
+
+@main_bp.route("/search")
+@conditional_login_required(scope='read')
+def search():
+    import time
+    query = request.args.get('q', '').strip()
+    server = request.args.get('server') or None
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if not 1 <= limit <= 200:
+        return jsonify({"error": "limit must be between 1 and 200"}), 400
+
+    if search_index.updated_at is None:
+        _coalesced_data()
+    elif time.time() - search_index.updated_at > SEARCH_INDEX_MAX_AGE:
+        _refresh_search_index_later()
+    return jsonify(search_index.search(query, limit, server))
+
 @main_bp.route("/data")
-@conditional_login_required
+@conditional_login_required(scope='read')
 def data():
-    return jsonify(get_all_data())
+    data_format = request.args.get('format', 'rows')
+    if data_format not in ('rows', 'columnar'):
+        return jsonify({"error": "format must be 'rows' or 'columnar'"}), 400
+    try:
+        query = ContainerQuery.from_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    snapshot = _coalesced_data()
+    if query is None and data_format == 'rows':
+        cached = not_modified(snapshot.etag)
+        return cached if cached is not None else snapshot_response(snapshot)
+
+    etag = compute_etag(data_format, repr(query), snapshot.etag)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    result = snapshot.data
+    if query is not None:
+        result = apply_query(result, query, snapshot.etag)
+    if data_format == 'columnar':
+        result = to_columnar(result)
+    return with_etag(jsonify(result), etag)
+
+@main_bp.route("/container/<server_name>/<container_id>")
+@conditional_login_required(scope='read')
+def container_details(server_name, container_id):
+    import docker
+    cached = container_detail_cache.get(server_name, container_id)
+    if cached is not None:
+        return jsonify(cached)
+
+    servers = discover_docker_clients()
+    server = next((s for s in servers if s['name'] == server_name and s['status'] == 'active'), None)
+    if not server:
+        return jsonify({"error": f"Server {server_name} not found or inactive"}), 404
+
+    try:
+        container = server['client'].containers.get(container_id)
+    except docker.errors.NotFound:
+        return jsonify({"error": f"Container {container_id} not found on {server_name}"}), 404
+    except Exception as e:
+        current_app.logger.error(f"Error inspecting {container_id} on {server_name}: {e}")
+        return jsonify({"error": str(e)}), 500
+
+    details = build_container_details(server_name, container)
+    container_detail_cache.put(details)
+    return jsonify(details)
 
 @main_bp.route("/check-updates", methods=["POST"])
-@conditional_login_required
+@conditional_login_required(scope='updates')
 def check_updates():
     update_checker.start_check()
     request_data = request.get_json() or {}
@@ -121,7 +231,7 @@ def check_updates():
     })
 
 @main_bp.route("/check-single-update", methods=["POST"])
-@conditional_login_required
+@conditional_login_required(scope='updates')
 def check_single_update():
     update_checker.start_check()
     request_data = request.get_json() or {}
@@ -186,7 +296,7 @@ def check_single_update():
         return jsonify({"error": str(e)}), 500
 
 @main_bp.route("/get-containers-list", methods=["POST"])  
-@conditional_login_required
+@conditional_login_required(scope='read')
 def get_containers_list():
     request_data = request.get_json() or {}
     server_filter = request_data.get('server_filter', 'all')
@@ -218,7 +328,7 @@ def get_containers_list():
     })
 
 @main_bp.route("/update-check-status", methods=["GET"])
-@conditional_login_required
+@conditional_login_required(scope='read')
 def get_update_check_status():
     return jsonify({
         "is_cancelled": update_checker.is_cancelled,
@@ -226,14 +336,14 @@ def get_update_check_status():
     })
 
 @main_bp.route("/cancel-updates", methods=["POST"])
-@conditional_login_required
+@conditional_login_required(scope='updates')
 def cancel_updates():
     update_checker.cancel_check()
     current_app.logger.info("Cancellation request received.")
     return jsonify({"status": "cancellation_requested"})
 
 @main_bp.route("/check-dependent-containers", methods=["POST"])
-@conditional_login_required
+@conditional_login_required(scope='read')
 def check_dependent_containers():
     data = request.get_json()
     server_name = data.get('server_name')
@@ -265,7 +375,7 @@ def check_dependent_containers():
         return jsonify({'dependent_containers': [], 'error': str(e)}), 200
     
 @main_bp.route("/update-container", methods=["POST"])
-@conditional_login_required
+@conditional_login_required(scope='updates')
 def update_container_route():
     data = request.get_json()
     server_name = data.get('server_name')
@@ -293,24 +403,8 @@ def update_container_route():
 
 
 
-def parse_image_name(image_name):
-    if ':' in image_name:
-        base_name, tag = image_name.rsplit(':', 1)
-    else:
-        base_name, tag = image_name, 'latest'
-    return base_name, tag
-
-def get_image_creation_time(image):
-    created_str = image.attrs.get('Created', '')
-    if created_str:
-        try:
-            return datetime.fromisoformat(created_str.replace('Z', '+00:00'))
-        except:
-            pass
-    return None
-
 @main_bp.route("/get-prune-info", methods=["POST"])
-@conditional_login_required
+@conditional_login_required(scope='read')
 def get_prune_info():
     request_data = request.get_json() or {}
     server_name = request_data.get('server_name', 'all')
@@ -321,101 +415,23 @@ def get_prune_info():
     if server_name != 'all':
         active_servers = [s for s in active_servers if s['name'] == server_name]
     
-    total_size = 0
-    total_count = 0
-    server_details = []
-    
-    for server in active_servers:
-        try:
-            all_images = server['client'].images.list()
-            used_images = set()
-            container_images_info = {}
-            
-            for container in server['client'].containers.list(all=True):
-                image_id = container.image.id
-                used_images.add(image_id)
-                
-                image_name = container.attrs.get('Config', {}).get('Image', '')
-                if image_name:
-                    base_name, tag = parse_image_name(image_name)
-                    key = f"{base_name}:{tag}"
-                    creation_time = get_image_creation_time(container.image)
-                    
-                    if key not in container_images_info or (creation_time and container_images_info[key]['created'] and creation_time > container_images_info[key]['created']):
-                        container_images_info[key] = {
-                            'id': image_id,
-                            'created': creation_time
-                        }
-            
-            unused_images = []
-            unused_size = 0
-            
-            for image in all_images:
-                if image.id not in used_images:
-                    size = image.attrs.get('Size', 0)
-                    
-                    if image.tags:
-                        tags = image.tags
-                    else:
-                        repo_tags = image.attrs.get('RepoTags', [])
-                        if repo_tags and len(repo_tags) > 0:
-                            tags = [repo_tags[0]]
-                        else:
-                            repo_digests = image.attrs.get('RepoDigests', [])
-                            if repo_digests and len(repo_digests) > 0:
-                                repo_name = repo_digests[0].split('@')[0]
-                                tags = [f"{repo_name}:<none>"]
-                            else:
-                                tags = ["<none>:<none>"]
-                    
-                    pending_update = False
-                    image_created = get_image_creation_time(image)
-                    
-                    for tag in tags:
-                        if tag != "<none>:<none>":
-                            if tag in container_images_info:
-                                used_image_info = container_images_info[tag]
-                                if image_created and used_image_info['created']:
-                                    if image_created > used_image_info['created']:
-                                        pending_update = True
-                                        break
-                    
-                    unused_images.append({
-                        'id': image.id,
-                        'tags': tags,
-                        'size': size,
-                        'pending_update': pending_update
-                    })
-                    
-                    if not pending_update:
-                        unused_size += size
-            
-            if unused_images:
-                count = sum(1 for img in unused_images if not img['pending_update'])
-                total_count += count
-                total_size += unused_size
-                
-                server_details.append({
-                    'server': server['name'],
-                    'count': count,
-                    'size': unused_size,
-                    'images': unused_images
-                })
-                
-        except Exception as e:
-            current_app.logger.error(f"Error getting prune info for {server['name']}: {e}")
-    
-    return jsonify({
-        'total_count': total_count,
-        'total_size': total_size,
-        'servers': server_details
-    })
+    plan = prune_planner.plan(active_servers)
+    plan['plan_id'] = prune_plans.issue(plan)
+    plan['plan_ttl'] = prune_plans.ttl_seconds
+    return jsonify(plan)
 
 @main_bp.route("/prune-images", methods=["POST"])
-@conditional_login_required
+@conditional_login_required(scope='updates')
 def prune_images():
     request_data = request.get_json() or {}
     server_name = request_data.get('server_name', 'all')
+    plan_id = request_data.get('plan_id')
+    
+    plan = None
+    if plan_id:
+        plan = prune_plans.load(plan_id)
+        if plan is None:
+            return jsonify({"error": "Prune plan expired or invalid, please review the images again"}), 410
     
     servers = discover_docker_clients()
     active_servers = [s for s in servers if s['status'] == 'active']
@@ -423,85 +439,35 @@ def prune_images():
     if server_name != 'all':
         active_servers = [s for s in active_servers if s['name'] == server_name]
     
-    total_size = 0
-    total_count = 0
-    server_results = []
+    def generate():
+        for event in prune_executor.execute(active_servers, plan):
+            yield json.dumps(event) + "\n"
     
-    for server in active_servers:
-        try:
-            all_images = server['client'].images.list()
-            used_images = set()
-            container_images_info = {}
-            
-            for container in server['client'].containers.list(all=True):
-                image_id = container.image.id
-                used_images.add(image_id)
-                
-                image_name = container.attrs.get('Config', {}).get('Image', '')
-                if image_name:
-                    base_name, tag = parse_image_name(image_name)
-                    key = f"{base_name}:{tag}"
-                    creation_time = get_image_creation_time(container.image)
-                    
-                    if key not in container_images_info or (creation_time and container_images_info[key]['created'] and creation_time > container_images_info[key]['created']):
-                        container_images_info[key] = {
-                            'id': image_id,
-                            'created': creation_time
-                        }
-            
-            removed_count = 0
-            removed_size = 0
-            
-            for image in all_images:
-                if image.id not in used_images:
-                    pending_update = False
-                    image_created = get_image_creation_time(image)
-                    
-                    tags = image.tags if image.tags else []
-                    for tag in tags:
-                        if tag != "<none>:<none>":
-                            if tag in container_images_info:
-                                used_image_info = container_images_info[tag]
-                                if image_created and used_image_info['created']:
-                                    if image_created > used_image_info['created']:
-                                        pending_update = True
-                                        break
-                    
-                    if not pending_update:
-                        try:
-                            size = image.attrs.get('Size', 0)
-                            long_client = docker.DockerClient(base_url=server['url'], timeout=60)
-                            long_client.images.remove(image.id, force=True)
-                            long_client.close()
-                            removed_count += 1
-                            removed_size += size
-                        except Exception as e:
-                            current_app.logger.warning(f"Could not remove image {image.id}: {e}")
-            
-            total_count += removed_count
-            total_size += removed_size
-            
-            if removed_count > 0:
-                server_results.append({
-                    'server': server['name'],
-                    'count': removed_count,
-                    'size': removed_size
-                })
-                
-            current_app.logger.info(f"Pruned {removed_count} images from {server['name']}, reclaimed {removed_size} bytes")
-            
-        except Exception as e:
-            current_app.logger.error(f"Error pruning images on {server['name']}: {e}")
-            return jsonify({"error": f"Failed to prune on {server['name']}: {str(e)}"}), 500
+    return Response(
+        generate(),
+        mimetype='application/x-ndjson',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@main_bp.route("/disk-usage")
+@conditional_login_required(scope='read')
+def disk_usage():
+    server_filter = request.args.get('server', 'all')
+    refresh = request.args.get('refresh', 'false').lower() == 'true'
     
-    return jsonify({
-        'total_count': total_count,
-        'total_size': total_size,
-        'servers': server_results
-    })
+    servers = discover_docker_clients()
+    active_servers = [s for s in servers if s['status'] == 'active']
+    
+    if server_filter != 'all':
+        active_servers = [s for s in active_servers if s['name'] == server_filter]
+    
+    return jsonify({'servers': disk_usage_cache.get_summaries(active_servers, use_cache=not refresh)})
 
 @main_bp.route("/get-container-logs", methods=["POST"])
-@conditional_login_required
+@conditional_login_required(scope='logs')
 def get_logs():
     request_data = request.get_json() or {}
     server_name = request_data.get('server_name')
@@ -541,91 +507,267 @@ def get_logs():
         return jsonify(result), 500
 
 
+@main_bp.route("/get-container-logs-page", methods=["POST"])
+@conditional_login_required(scope='logs')
+def get_logs_page_route():
+    request_data = request.get_json() or {}
+    server_name = request_data.get('server_name')
+    container_name = request_data.get('container_name')
+    is_swarm = request_data.get('is_swarm', False)
+    
+    if not server_name or not container_name:
+        return jsonify({"error": "Missing server_name or container_name"}), 400
+    try:
+        page_size = int(request_data.get('page_size', 500))
+    except (TypeError, ValueError):
+        return jsonify({"error": "page_size must be an integer"}), 400
+    
+    servers = discover_docker_clients()
+    server = next((s for s in servers if s['name'] == server_name and s['status'] == 'active'), None)
+    
+    if not server:
+        return jsonify({"error": f"Server {server_name} not found or inactive"}), 404
+    
+    is_newest_page = (
+        not request_data.get('cursor') and not request_data.get('since') and not request_data.get('until')
+        and request_data.get('direction', 'backward') == 'backward'
+    )
+    if is_newest_page and current_app.config.get('LOG_BUFFER_LINES', 0) > 0:
+        from .log_buffer import recent_log_cache
+        buffered = recent_log_cache.get_page(server['url'], container_name, is_swarm, page_size)
+        if buffered:
+            return jsonify(buffered), 200
+    
+    result = get_logs_page(
+        server['client'],
+        container_name,
+        is_swarm=is_swarm,
+        page_size=page_size,
+        cursor=request_data.get('cursor'),
+        direction=request_data.get('direction', 'backward'),
+        since=request_data.get('since'),
+        until=request_data.get('until')
+    )
+    
+    if result['success']:
+        return jsonify(result), 200
+    else:
+        return jsonify(result), 500
+
+
+@main_bp.route("/search-container-logs", methods=["POST"])
+@conditional_login_required(scope='logs')
+def search_logs_route():
+    request_data = request.get_json() or {}
+    server_name = request_data.get('server_name')
+    container_name = request_data.get('container_name')
+    is_swarm = request_data.get('is_swarm', False)
+    
+    if not server_name or not container_name:
+        return jsonify({"error": "Missing server_name or container_name"}), 400
+    
+    try:
+        search = LogSearch(
+            request_data.get('query', ''),
+            regex=request_data.get('regex', False),
+            case_sensitive=request_data.get('case_sensitive', False),
+            levels=request_data.get('levels'),
+            context=request_data.get('context', 2),
+            limit=request_data.get('limit', 200)
+        )
+    except re.error as e:
+        return jsonify({"error": f"Invalid regular expression: {e}"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    servers = discover_docker_clients()
+    server = next((s for s in servers if s['name'] == server_name and s['status'] == 'active'), None)
+    
+    if not server:
+        return jsonify({"error": f"Server {server_name} not found or inactive"}), 404
+    
+    stream_client = create_streaming_client(server['url'])
+    since = request_data.get('since')
+    until = request_data.get('until')
+    
+    def generate():
+        try:
+            for result in search_logs(stream_client, container_name, search, is_swarm, since, until):
+                yield json.dumps(result) + "\n"
+        finally:
+            try:
+                stream_client.close()
+            except:
+                pass
+    
+    return Response(
+        generate(),
+        mimetype='application/x-ndjson',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
 @main_bp.route("/stream-container-logs", methods=["POST"])
-@conditional_login_required
+@conditional_login_required(scope='logs')
 def stream_logs():
     import time
-    import gevent
-    from gevent.queue import Queue, Empty
+    from gevent.queue import Empty
+    from .log_hub import log_stream_registry
+    from .log_framing import LogFrameEncoder
+    from .logs_manager import LogCursorTracker, LogResumeFilter
+    from .log_structured import LogFieldFilter, parse_log_fields
     
     request_data = request.get_json() or {}
     server_name = request_data.get('server_name')
     container_name = request_data.get('container_name')
     tail = request_data.get('tail', 100)
     is_swarm = request_data.get('is_swarm', False)
+    framing = request_data.get('framing', 'line')
+    compress = request_data.get('compress', False) and 'gzip' in request.headers.get('Accept-Encoding', '')
+    send_fields = request_data.get('fields', False)
     
     if not server_name or not container_name:
         return jsonify({"error": "Missing server_name or container_name"}), 400
     
+    if tail != 'all':
+        try:
+            tail = max(0, int(tail))
+        except (TypeError, ValueError):
+            return jsonify({"error": "tail must be an integer or 'all'"}), 400
+    try:
+        resume = LogResumeFilter.from_cursor(request_data.get('resume'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        field_filter = LogFieldFilter.parse(request_data.get('filter'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
     servers = discover_docker_clients()
     server = next((s for s in servers if s['name'] == server_name and s['status'] == 'active'), None)
     
     if not server:
         return jsonify({"error": f"Server {server_name} not found or inactive"}), 404
     
-    stream_client = create_streaming_client(server['url'])
     logger = current_app.logger
+    encoder = LogFrameEncoder(framing, compress)
     
     def generate():
-        queue = Queue()
-        stop_flag = [False]
+        subscription = log_stream_registry.subscribe(server['url'], container_name, is_swarm, tail, resume)
+        cursor = LogCursorTracker()
         heartbeat_interval = 20
+        flush_interval = 0.025
+        max_frame_bytes = 64 * 1024
         last_yield = time.time()
+        frame = []
+        frame_fields = []
+        frame_bytes = 0
+        frame_deadline = None
         
-        def log_reader():
-            try:
-                if is_swarm:
-                    stream_func = stream_service_logs
-                else:
-                    stream_func = stream_container_logs
-                
-                for log_line in stream_func(stream_client, container_name, tail):
-                    if stop_flag[0]:
-                        break
-                    queue.put(('log', log_line))
-                    
-                queue.put(('end', None))
-            except Exception as e:
-                queue.put(('error', str(e)))
-        
-        reader_greenlet = gevent.spawn(log_reader)
+        def encode_frame():
+            cursor.update(frame)
+            return encoder.encode_lines(frame, cursor=cursor.cursor, fields=frame_fields if send_fields else None)
         
         try:
             while True:
+                if frame:
+                    timeout = max(0, frame_deadline - time.time())
+                else:
+                    timeout = heartbeat_interval - (time.time() - last_yield)
+                
                 try:
-                    msg_type, data = queue.get(timeout=1)
-                    
-                    if msg_type == 'log':
-                        last_yield = time.time()
-                        yield json.dumps({"line": data}) + "\n"
-                    elif msg_type == 'end':
-                        break
-                    elif msg_type == 'error':
-                        logger.error(f"Stream error: {data}")
-                        yield json.dumps({"error": data}) + "\n"
-                        break
-                        
+                    msg_type, data = subscription.get(timeout=max(timeout, 0))
                 except Empty:
-                    current_time = time.time()
-                    if current_time - last_yield >= heartbeat_interval:
-                        last_yield = current_time
-                        yield json.dumps({"heartbeat": True}) + "\n"
+                    last_yield = time.time()
+                    if frame:
+                        yield encode_frame()
+                        frame, frame_fields, frame_bytes = [], [], 0
+                    else:
+                        yield encoder.encode_event({"heartbeat": True})
+                    continue
+                
+                if msg_type == 'log':
+                    fields = None
+                    if field_filter or send_fields:
+                        # Parsed while streaming so filtered lines never reach the browser
+                        fields = parse_log_fields(data.data)
+                    if not field_filter or field_filter.matches(fields):
+                        if not frame:
+                            frame_deadline = time.time() + flush_interval
+                        if send_fields:
+                            frame_fields.append(fields.to_dict())
+                        frame.append(data)
+                        frame_bytes += len(data.data)
+                    # A steady flow of lines never times out the get above, so the deadline is checked here too
+                    if frame and (frame_bytes >= max_frame_bytes or time.time() >= frame_deadline):
+                        last_yield = time.time()
+                        yield encode_frame()
+                        frame, frame_fields, frame_bytes = [], [], 0
+                    continue
+                
+                if frame:
+                    yield encode_frame()
+                    frame, frame_fields, frame_bytes = [], [], 0
+                
+                if msg_type == 'skipped':
+                    last_yield = time.time()
+                    yield encoder.encode_event({"skipped": data})
+                    continue
+                
+                if msg_type == 'end':
+                    break
+                elif msg_type == 'error':
+                    logger.error(f"Stream error: {data}")
+                    yield encoder.encode_event({"error": data})
+                    break
+            
+            yield encoder.close()
                         
         except GeneratorExit:
             logger.debug(f"Stream closed for {container_name}")
-            stop_flag[0] = True
             raise
         finally:
-            stop_flag[0] = True
-            reader_greenlet.kill()
-            try:
-                stream_client.close()
-            except:
-                pass
+            subscription.close()
     
     response = Response(
         generate(),
-        mimetype='application/x-ndjson',
+        mimetype=encoder.mimetype,
+        headers=encoder.headers
+    )
+    response.timeout = None
+    return response
+
+@main_bp.route("/events")
+@conditional_login_required(scope='read')
+def status_events():
+    from gevent.queue import Empty
+    from .status_events import status_event_hub
+
+    servers = discover_docker_clients()
+
+    def generate():
+        subscription = status_event_hub.subscribe(servers)
+        heartbeat_interval = 20
+        try:
+            # Tells EventSource how long to wait before reconnecting
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event_type, data = subscription.get(timeout=heartbeat_interval)
+                except Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"event: {event_type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+        finally:
+            subscription.close()
+
+    response = Response(
+        generate(),
+        mimetype='text/event-stream',
         headers={
             'Cache-Control': 'no-cache',
             'X-Accel-Buffering': 'no',
@@ -635,16 +777,108 @@ def stream_logs():
     response.timeout = None
     return response
 
+@main_bp.route("/log-stream-stats")
+@conditional_login_required(scope='read')
+def log_stream_stats():
+    from .log_hub import log_stream_registry
+    from .status_events import status_event_hub
+    stats = {
+        "streams": log_stream_registry.get_stats(),
+        "status_events": status_event_hub.get_stats(),
+        "container_details": container_detail_cache.get_stats()
+    }
+    if current_app.config.get('LOG_BUFFER_LINES', 0) > 0:
+        from .log_buffer import recent_log_cache
+        stats["recent_buffers"] = recent_log_cache.get_stats()
+    return jsonify(stats)
+
+@main_bp.route("/stream-stack-logs", methods=["POST"])
+@conditional_login_required(scope='logs')
+def stream_stack_logs():
+    import time
+    from .stack_logs import StackLogMerger, find_stack_sources
+    from .log_framing import LogFrameEncoder
+    from .log_structured import LogFieldFilter, parse_log_fields
+
+    request_data = request.get_json() or {}
+    stack = request_data.get('stack')
+    server_name = request_data.get('server_name', 'all')
+    tail = request_data.get('tail', 50)
+    framing = request_data.get('framing', 'line')
+    compress = request_data.get('compress', False) and 'gzip' in request.headers.get('Accept-Encoding', '')
+
+    if not stack:
+        return jsonify({"error": "Missing stack"}), 400
+
+    try:
+        field_filter = LogFieldFilter.parse(request_data.get('filter'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    servers = [s for s in discover_docker_clients() if s['status'] == 'active']
+    if server_name != 'all':
+        servers = [s for s in servers if s['name'] == server_name]
+
+    sources = find_stack_sources(servers, stack)
+    if not sources:
+        return jsonify({"error": f"No running containers found for stack {stack}"}), 404
+
+    logger = current_app.logger
+    encoder = LogFrameEncoder(framing, compress)
+    merger = StackLogMerger(sources, tail)
+
+    def generate():
+        heartbeat_interval = 20
+        last_yield = time.time()
+        batches = iter(merger)
+
+        try:
+            yield encoder.encode_event({"sources": [source.label for source in sources]})
+            for batch in batches:
+                if batch and field_filter:
+                    batch = [(label, line) for label, line in batch if field_filter.matches(parse_log_fields(line.data))]
+                if batch:
+                    last_yield = time.time()
+                    yield encoder.encode_lines([line for _, line in batch], [label for label, _ in batch])
+                elif time.time() - last_yield >= heartbeat_interval:
+                    last_yield = time.time()
+                    yield encoder.encode_event({"heartbeat": True})
+
+            for error in merger.errors:
+                logger.error(f"Stack stream error for {error['source']}: {error['error']}")
+                yield encoder.encode_event(error)
+            yield encoder.close()
+        except GeneratorExit:
+            logger.debug(f"Stack stream closed for {stack}")
+            raise
+        finally:
+            batches.close()
+
+    response = Response(
+        generate(),
+        mimetype=encoder.mimetype,
+        headers=encoder.headers
+    )
+    response.timeout = None
+    return response
+
 @main_bp.route("/export/json")
-@conditional_login_required
+@conditional_login_required(scope='read')
 def export_json():
     server_filter = request.args.get('server', 'all')
-    data = get_all_data()
+    snapshot = _coalesced_data()
+    data = snapshot.data
     
     filtered_containers = data.get("containers", [])
     if server_filter != 'all':
         filtered_containers = [c for c in filtered_containers if c.get("server") == server_filter]
-        
+
+    # Weak: the export timestamp differs between otherwise identical exports
+    etag = compute_etag(current_app.config['APP_VERSION'], server_filter, snapshot.etag)
+    cached = not_modified(etag, weak=True)
+    if cached is not None:
+        return cached
+
     export_data = {
         "export_info": {
             "timestamp": datetime.now().isoformat(),
@@ -665,17 +899,76 @@ def export_json():
             ]
         export_data["containers"].append(export_container)
 
-    formatted_json = json.dumps(export_data, indent=2, ensure_ascii=False)
+    formatted_json = current_app.json.dumps(export_data, indent=2, ensure_ascii=False)
     filename = f'dockpeek-export-{server_filter}-{datetime.now().strftime("%Y%m%d-%H%M%S")}.json'
     
     response = make_response(formatted_json)
     response.headers['Content-Disposition'] = f'attachment; filename={filename}'
     response.headers['Content-Type'] = 'application/json'
+    return with_etag(response, etag, weak=True)
+
+def _parse_export_time(value):
+    import math
+    from .logs_manager import parse_cursor_timestamp
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        return parse_cursor_timestamp(value)
+    # inf, nan and values like 1e400 are not timestamps
+    if not math.isfinite(seconds):
+        return None
+    try:
+        return parse_cursor_timestamp(seconds)
+    except (OverflowError, ValueError):
+        return None
+
+@main_bp.route("/export/logs")
+@conditional_login_required(scope='logs')
+def export_logs_route():
+    from .log_export import EXPORT_FORMATS, LogExportTarget, export_logs
+
+    requested = [(key, False) for key in request.args.getlist('container')]
+    requested += [(key, True) for key in request.args.getlist('service')]
+    if not requested:
+        return jsonify({"error": "Missing container or service"}), 400
+
+    export_format = request.args.get('format', 'gzip' if len(requested) == 1 else 'tar.gz')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unsupported format {export_format}"}), 400
+
+    since = _parse_export_time(request.args.get('since'))
+    until = _parse_export_time(request.args.get('until'))
+    if (request.args.get('since') and since is None) or (request.args.get('until') and until is None):
+        return jsonify({"error": "since and until must be unix or RFC 3339 timestamps"}), 400
+
+    servers = {s['name']: s for s in discover_docker_clients() if s['status'] == 'active'}
+    targets = []
+    for key, is_swarm in requested:
+        server_name, _, name = key.rpartition(':')
+        server = servers.get(server_name)
+        if not server or not name:
+            return jsonify({"error": f"Server for {key} not found or inactive"}), 404
+        targets.append(LogExportTarget(server_name, server['url'], name, is_swarm))
+
+    if len(targets) == 1:
+        base_name = f"{targets[0].name}-logs"
+    else:
+        base_name = "dockpeek-logs"
+    extension = 'tar.gz' if export_format == 'tar.gz' else 'log.gz'
+    filename = f'{base_name}-{datetime.now().strftime("%Y%m%d-%H%M%S")}.{extension}'
+
+    response = Response(
+        export_logs(targets, export_format, since, until),
+        mimetype='application/gzip',
+        headers={
+            'Content-Disposition': f'attachment; filename={filename}',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+    response.timeout = None
     return response
 
-@main_bp.route("/status")
-@conditional_login_required
-def get_status():
+def _collect_statuses():
     servers = discover_docker_clients()
     statuses = []
     
@@ -725,4 +1018,14 @@ def get_status():
         except Exception as e:
             current_app.logger.error(f"Error getting status from {server['name']}: {e}")
     
-    return jsonify({'statuses': statuses})
\ No newline at end of file
+    return statuses
+
+@main_bp.route("/status")
+@conditional_login_required(scope='read')
+def get_status():
+    snapshot = request_coalescer.run(('status',), lambda: json_snapshot({'statuses': _collect_statuses()}))
+    container_detail_cache.observe(snapshot.data['statuses'])
+    cached = not_modified(snapshot.etag)
+    if cached is not None:
+        return cached
+    return snapshot_response(snapshot)
\ No newline at end of file
@@ -0,0 +1,359 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+from datetime import datetime
+from queue import Queue
+from typing import Callable, Dict, Iterator, List, Optional
+
+from flask import current_app
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+
+from .docker_utils import DockerClientFactory
+from .disk_usage import DiskUsageCache, disk_usage_cache, image_unique_sizes
+
+logger = logging.getLogger(__name__)
+
+NONE_TAG = "<none>:<none>"
+
+
+def parse_image_name(image_name):
+    if ':' in image_name:
+        base_name, tag = image_name.rsplit(':', 1)
+    else:
+        base_name, tag = image_name, 'latest'
+    return base_name, tag
+
+
+def parse_created(value) -> Optional[float]:
+    # /images/json reports Created as a unix timestamp, inspect output as ISO 8601
+    if isinstance(value, (int, float)):
+        return float(value)
+    if value:
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            pass
+    return None
+
+
+@dataclass
+class ImageRecord:
+    id: str
+    tags: List[str]
+    size: int
+    created: Optional[float]
+    shared_size: int = 0
+
+    @classmethod
+    def from_api(cls, data: Dict, unique_sizes: Optional[Dict[str, int]] = None) -> 'ImageRecord':
+        tags = [t for t in (data.get('RepoTags') or []) if t != NONE_TAG]
+        if not tags:
+            repo_digests = data.get('RepoDigests') or []
+            if repo_digests:
+                repo_name = repo_digests[0].split('@')[0]
+                tags = [f"{repo_name}:<none>"]
+            else:
+                tags = [NONE_TAG]
+
+        image_id = data.get('Id', '')
+        size = data.get('Size', 0) or 0
+        shared_size = 0
+        if unique_sizes and image_id in unique_sizes:
+            shared_size = max(size - unique_sizes[image_id], 0)
+
+        return cls(
+            id=image_id,
+            tags=tags,
+            size=size,
+            created=parse_created(data.get('Created')),
+            shared_size=shared_size
+        )
+
+    @property
+    def reclaimable_size(self) -> int:
+        return self.size - self.shared_size
+
+    def to_dict(self, pending_update: bool) -> Dict:
+        return {
+            'id': self.id,
+            'tags': self.tags,
+            'size': self.reclaimable_size,
+            'shared_size': self.shared_size,
+            'pending_update': pending_update
+        }
+
+
+class HostImageIndex:
+    def __init__(self, images: List[Dict], containers: List[Dict],
+                 resolve_image_name: Optional[Callable[[str], str]] = None,
+                 unique_sizes: Optional[Dict[str, int]] = None):
+        self.images: Dict[str, ImageRecord] = {}
+        for data in images:
+            record = ImageRecord.from_api(data, unique_sizes)
+            self.images[record.id] = record
+
+        self.used_ids = set()
+        self.newest_used_by_tag: Dict[str, float] = {}
+
+        for container in containers:
+            image_id = container.get('ImageID', '')
+            self.used_ids.add(image_id)
+
+            image_name = container.get('Image', '')
+            # The daemon reports the image ID instead of the name once the tag has moved on
+            if image_name.startswith('sha256:') and resolve_image_name:
+                image_name = resolve_image_name(container.get('Id', ''))
+            if not image_name or image_name.startswith('sha256:'):
+                continue
+
+            record = self.images.get(image_id)
+            if not record or record.created is None:
+                continue
+
+            base_name, tag = parse_image_name(image_name)
+            key = f"{base_name}:{tag}"
+            newest = self.newest_used_by_tag.get(key)
+            if newest is None or record.created > newest:
+                self.newest_used_by_tag[key] = record.created
+
+    @classmethod
+    def build(cls, client, unique_sizes: Optional[Dict[str, int]] = None) -> 'HostImageIndex':
+        api = client.api
+        images = api.images()
+        containers = api.containers(all=True)
+
+        def resolve_image_name(container_id):
+            try:
+                return api.inspect_container(container_id).get('Config', {}).get('Image', '')
+            except Exception as e:
+                logger.debug(f"Failed to inspect container {container_id[:12]}: {e}")
+                return ''
+
+        return cls(images, containers, resolve_image_name, unique_sizes)
+
+    def is_pending_update(self, record: ImageRecord) -> bool:
+        if record.created is None:
+            return False
+        for tag in record.tags:
+            if tag == NONE_TAG:
+                continue
+            newest = self.newest_used_by_tag.get(tag)
+            if newest is not None and record.created > newest:
+                return True
+        return False
+
+    def unused_images(self) -> List[Dict]:
+        return [
+            record.to_dict(self.is_pending_update(record))
+            for image_id, record in self.images.items()
+            if image_id not in self.used_ids
+        ]
+
+
+class PrunePlanner:
+    def __init__(self, disk_usage: DiskUsageCache, host_timeout: float = 30.0, disk_usage_wait: float = 2.0):
+        self.disk_usage = disk_usage
+        self.host_timeout = host_timeout
+        # /system/df walks every layer; the preview waits this long for it before falling back to image sizes
+        self.disk_usage_wait = disk_usage_wait
+
+    def plan_host(self, server: Dict) -> Optional[Dict]:
+        # Layers shared with other images are not freed, so sizes come from /system/df when available
+        unique_sizes = image_unique_sizes(self.disk_usage.get_nowait(server, self.disk_usage_wait))
+        index = HostImageIndex.build(server['client'], unique_sizes)
+        unused_images = index.unused_images()
+        if not unused_images:
+            return None
+
+        prunable = [img for img in unused_images if not img['pending_update']]
+        return {
+            'server': server['name'],
+            'count': len(prunable),
+            'size': sum(img['size'] for img in prunable),
+            'images': unused_images
+        }
+
+    def plan(self, servers: List[Dict]) -> Dict:
+        server_details = []
+
+        if servers:
+            executor = ThreadPoolExecutor(max_workers=len(servers))
+            try:
+                future_to_server = {executor.submit(self.plan_host, server): server for server in servers}
+                # One deadline for all hosts; a hung host is left behind instead of holding the request
+                _, not_done = wait(future_to_server, timeout=self.host_timeout)
+
+                for future, server in future_to_server.items():
+                    if future in not_done:
+                        logger.error(f"Timeout getting prune info for {server['name']} after {self.host_timeout}s")
+                        continue
+                    try:
+                        details = future.result()
+                        if details:
+                            server_details.append(details)
+                    except Exception as e:
+                        logger.error(f"Error getting prune info for {server['name']}: {e}")
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        return {
+            'total_count': sum(s['count'] for s in server_details),
+            'total_size': sum(s['size'] for s in server_details),
+            'servers': server_details
+        }
+
+
+class PrunePlanTokens:
+    """Signed, short-lived plan IDs carrying the exact image IDs approved per host.
+
+    The plan travels with the token instead of living in process memory, so the
+    prune request may land on any gunicorn worker.
+    """
+
+    def __init__(self, ttl_seconds: int = 300):
+        self.ttl_seconds = ttl_seconds
+
+    def _serializer(self) -> URLSafeTimedSerializer:
+        return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='dockpeek-prune-plan')
+
+    def issue(self, plan: Dict) -> str:
+        # Sizes travel with the IDs so the prune does not need /system/df again to report them
+        image_sizes = {
+            details['server']: {img['id']: img['size'] for img in details['images'] if not img['pending_update']}
+            for details in plan['servers']
+        }
+        return self._serializer().dumps({s: sizes for s, sizes in image_sizes.items() if sizes})
+
+    def load(self, plan_id: str) -> Optional[Dict[str, Dict[str, int]]]:
+        try:
+            return self._serializer().loads(plan_id, max_age=self.ttl_seconds)
+        except SignatureExpired:
+            logger.info("Prune plan expired")
+        except BadSignature:
+            logger.warning("Rejected prune plan with invalid signature")
+        return None
+
+
+class PruneExecutor:
+    def __init__(self, planner: PrunePlanner, client_factory: Optional[DockerClientFactory] = None,
+                 max_parallel_removals: int = 4):
+        self.planner = planner
+        self.client_factory = client_factory or DockerClientFactory()
+        self.max_parallel_removals = max_parallel_removals
+
+    def _remove_image(self, client, server_name: str, image: Dict) -> Dict:
+        event = {
+            'type': 'image',
+            'server': server_name,
+            'id': image['id'],
+            'tags': image['tags'],
+            'size': image['size']
+        }
+        try:
+            client.api.remove_image(image['id'], force=True)
+            event['removed'] = True
+        except Exception as e:
+            logger.warning(f"Could not remove image {image['id']} on {server_name}: {e}")
+            event['removed'] = False
+            event['error'] = str(e)
+        return event
+
+    def _revalidate(self, client, server: Dict, image_sizes: Dict[str, int], events: Queue) -> List[Dict]:
+        server_name = server['name']
+        current_images = {img.get('Id'): img for img in client.api.images()}
+        used_ids = {c.get('ImageID') for c in client.api.containers(all=True)}
+
+        images = []
+        for image_id, size in image_sizes.items():
+            data = current_images.get(image_id)
+            if data is None or image_id in used_ids:
+                events.put({
+                    'type': 'image',
+                    'server': server_name,
+                    'id': image_id,
+                    'removed': False,
+                    'skipped': 'no longer present' if data is None else 'now in use'
+                })
+                continue
+            image = ImageRecord.from_api(data).to_dict(False)
+            image['size'] = size
+            images.append(image)
+        return images
+
+    def _prune_host(self, server: Dict, events: Queue, image_sizes: Optional[Dict[str, int]] = None):
+        server_name = server['name']
+        removed_count = 0
+        removed_size = 0
+
+        try:
+            client = self.client_factory.create_client(server['url'], use_long_timeout=True)
+            try:
+                if image_sizes is not None:
+                    images = self._revalidate(client, server, image_sizes, events)
+                else:
+                    details = self.planner.plan_host(server)
+                    images = [img for img in details['images'] if not img['pending_update']] if details else []
+
+                if images:
+                    with ThreadPoolExecutor(max_workers=self.max_parallel_removals) as pool:
+                        futures = [pool.submit(self._remove_image, client, server_name, img) for img in images]
+                        for future in as_completed(futures):
+                            event = future.result()
+                            if event['removed']:
+                                removed_count += 1
+                                removed_size += event['size']
+                            events.put(event)
+            finally:
+                client.close()
+                if removed_count:
+                    self.planner.disk_usage.invalidate(server_name)
+
+            logger.info(f"Pruned {removed_count} images from {server_name}, reclaimed {removed_size} bytes")
+            events.put({'type': 'server', 'server': server_name, 'count': removed_count, 'size': removed_size})
+        except Exception as e:
+            logger.error(f"Error pruning images on {server_name}: {e}")
+            events.put({
+                'type': 'server',
+                'server': server_name,
+                'count': removed_count,
+                'size': removed_size,
+                'error': str(e)
+            })
+
+    def execute(self, servers: List[Dict], plan: Optional[Dict[str, Dict[str, int]]] = None) -> Iterator[Dict]:
+        server_results = []
+        errors = []
+
+        if plan is not None:
+            servers = [s for s in servers if s['name'] in plan]
+
+        if servers:
+            events = Queue()
+            with ThreadPoolExecutor(max_workers=len(servers)) as executor:
+                for server in servers:
+                    image_sizes = plan[server['name']] if plan is not None else None
+                    executor.submit(self._prune_host, server, events, image_sizes)
+
+                pending_servers = len(servers)
+                while pending_servers:
+                    event = events.get()
+                    if event['type'] == 'server':
+                        pending_servers -= 1
+                        if event['count'] > 0:
+                            server_results.append({'server': event['server'], 'count': event['count'], 'size': event['size']})
+                        if 'error' in event:
+                            errors.append({'server': event['server'], 'error': event['error']})
+                    yield event
+
+        yield {
+            'type': 'summary',
+            'total_count': sum(s['count'] for s in server_results),
+            'total_size': sum(s['size'] for s in server_results),
+            'servers': server_results,
+            'errors': errors
+        }
+
+
+prune_planner = PrunePlanner(disk_usage_cache)
+prune_executor = PruneExecutor(prune_planner)
+prune_plans = PrunePlanTokens()
@@ -0,0 +1,225 @@
+"""Inverted index behind /search.
+
+Container names, image repositories and tags, stacks, dockpeek.tags labels,
+published ports and Traefik hosts are split into lowercase tokens; every
+token maps to the containers holding it, weighted by the field it came from.
+Query terms match tokens by prefix through a sorted token list, so a lookup
+touches only the matching tokens' postings rather than every container.
+
+The index is refreshed from each /data collection and only re-tokenizes
+containers whose indexed fields changed.
+"""
+import heapq
+import re
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+TOKEN_SPLIT_PATTERN = re.compile(r'[^a-z0-9]+')
+
+FIELD_WEIGHTS = {'name': 10, 'stack': 6, 'tag': 5, 'image': 4, 'traefik': 3, 'port': 3}
+# A term equal to a whole token outranks one that is only its prefix
+EXACT_MATCH_BONUS = 2
+# /search answers from an older index but refreshes it in the background
+MAX_AGE_SECONDS = 60
+
+PREFIX_CACHE_SIZE = 256
+
+DocKey = Tuple[str, str]
+
+
+def tokenize(value: str) -> List[str]:
+    # Queries are split the same way, so "my-app" finds "my-app-1" through "my" and "app"
+    return [token for token in TOKEN_SPLIT_PATTERN.split(value.lower()) if token]
+
+
+def _split_image(image: str) -> Tuple[str, str]:
+    repository, separator, tag = image.rpartition(':')
+    # A colon followed by a path is a registry port, not a tag
+    if not separator or '/' in tag:
+        return image, ''
+    return repository, tag
+
+
+def _indexed_fields(c: Dict) -> Tuple:
+    return (
+        c.get('name') or '',
+        c.get('image') or '',
+        c.get('stack') or '',
+        tuple(c.get('tags') or ()),
+        tuple([p.get('host_port') or '' for p in c.get('ports') or ()]),
+        tuple([r.get('host') or '' for r in c.get('traefik_routes') or ()])
+    )
+
+
+def _document_tokens(fields: Tuple) -> Dict[str, Tuple[int, str]]:
+    name, image, stack, tags, ports, hosts = fields
+    tokens: Dict[str, Tuple[int, str]] = {}
+
+    def add(values, field):
+        weight = FIELD_WEIGHTS[field]
+        for value in values:
+            for token in tokenize(value):
+                if token not in tokens or tokens[token][0] < weight:
+                    tokens[token] = (weight, field)
+
+    add([name], 'name')
+    add([stack], 'stack')
+    add(tags, 'tag')
+    add(_split_image(image), 'image')
+    add(hosts, 'traefik')
+    add(ports, 'port')
+    return tokens
+
+
+class ContainerSearchIndex:
+    def __init__(self):
+        self.updated_at: Optional[float] = None
+        # (server, name) -> (indexed fields, container, {token: (weight, field)})
+        self._docs: Dict[DocKey, Tuple[Tuple, Dict, Dict[str, Tuple[int, str]]]] = {}
+        # token -> {weight: containers}, so a prefix expands with set unions rather than per-posting work
+        self._postings: Dict[str, Dict[int, Set[DocKey]]] = {}
+        self._tokens: List[str] = []
+        self._by_server: Dict[str, Set[DocKey]] = {}
+        # Prefix expansions of recent query terms; a search-as-you-type session repeats them
+        self._prefix_cache: 'OrderedDict[str, Dict[int, Set[DocKey]]]' = OrderedDict()
+        self._source = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _add_doc(self, key: DocKey, fields: Tuple, container: Dict):
+        self._prefix_cache.clear()
+        tokens = _document_tokens(fields)
+        self._docs[key] = (fields, container, tokens)
+        self._by_server.setdefault(key[0], set()).add(key)
+        for token, (weight, _) in tokens.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._tokens, token)
+            postings.setdefault(weight, set()).add(key)
+
+    def _remove_doc(self, key: DocKey):
+        self._prefix_cache.clear()
+        _, _, tokens = self._docs.pop(key)
+        self._by_server[key[0]].discard(key)
+        for token, (weight, _) in tokens.items():
+            postings = self._postings[token]
+            postings[weight].discard(key)
+            if not postings[weight]:
+                del postings[weight]
+            if not postings:
+                del self._postings[token]
+                del self._tokens[bisect_left(self._tokens, token)]
+
+    def update(self, containers: List[Dict]):
+        """Brings the index in line with a /data container list, re-tokenizing only what changed."""
+        if containers is self._source:
+            return
+        self._source = containers
+
+        seen = set()
+        for c in containers:
+            key = (c.get('server') or '', c.get('name') or '')
+            seen.add(key)
+            fields = _indexed_fields(c)
+            doc = self._docs.get(key)
+            if doc is not None and doc[0] == fields:
+                # Unchanged tokens, but keep the latest status for results
+                self._docs[key] = (fields, c, doc[2])
+                continue
+            if doc is not None:
+                self._remove_doc(key)
+            self._add_doc(key, fields, c)
+
+        for key in [key for key in self._docs if key not in seen]:
+            self._remove_doc(key)
+        self.updated_at = time.time()
+
+    def _prefix_matches(self, term: str) -> Dict[int, Set[DocKey]]:
+        """Containers with a token starting with ``term``, partitioned by their best score for it."""
+        partition = self._prefix_cache.get(term)
+        if partition is None:
+            partition = self._prefix_cache[term] = self._expand_prefix(term)
+            if len(self._prefix_cache) > PREFIX_CACHE_SIZE:
+                self._prefix_cache.popitem(last=False)
+        else:
+            self._prefix_cache.move_to_end(term)
+        return partition
+
+    def _expand_prefix(self, term: str) -> Dict[int, Set[DocKey]]:
+        levels: Dict[int, Set[DocKey]] = {}
+        tokens = self._tokens
+        for position in range(bisect_left(tokens, term), len(tokens)):
+            token = tokens[position]
+            if not token.startswith(term):
+                break
+            bonus = EXACT_MATCH_BONUS if token == term else 1
+            for weight, keys in self._postings[token].items():
+                score = weight * bonus
+                if score in levels:
+                    levels[score] |= keys
+                else:
+                    levels[score] = set(keys)
+
+        partition: Dict[int, Set[DocKey]] = {}
+        assigned: Set[DocKey] = set()
+        for score in sorted(levels, reverse=True):
+            keys = levels[score] - assigned
+            if keys:
+                partition[score] = keys
+                assigned |= keys
+        return partition
+
+    def _matched_fields(self, key: DocKey, terms: List[str]) -> List[str]:
+        return sorted({field for token, (_, field) in self._docs[key][2].items()
+                       if any(token.startswith(term) for term in terms)})
+
+    def search(self, query: str, limit: int = 20, server: Optional[str] = None) -> Dict:
+        terms = list(dict.fromkeys(tokenize(query)))
+        # Scores are small integers, so matches stay grouped by score and every
+        # step is a set operation instead of per-container Python work
+        partition: Dict[int, Set[DocKey]] = {}
+        for i, term in enumerate(terms):
+            matches = self._prefix_matches(term)
+            if i == 0:
+                partition = matches
+                if server is not None:
+                    on_server = self._by_server.get(server, set())
+                    partition = {score: keys & on_server for score, keys in partition.items()}
+            else:
+                combined: Dict[int, Set[DocKey]] = {}
+                for score, keys in partition.items():
+                    for term_score, term_keys in matches.items():
+                        common = keys & term_keys
+                        if common:
+                            combined.setdefault(score + term_score, set()).update(common)
+                partition = combined
+            if not any(partition.values()):
+                partition = {}
+                break
+
+        top: List[Tuple[int, DocKey]] = []
+        for score in sorted(partition, reverse=True):
+            if len(top) >= limit:
+                break
+            top.extend((score, key) for key in heapq.nsmallest(limit - len(top), partition[score]))
+
+        results = []
+        for score, key in top:
+            c = self._docs[key][1]
+            results.append({
+                "server": c.get('server'),
+                "name": c.get('name'),
+                "stack": c.get('stack'),
+                "image": c.get('image'),
+                "status": c.get('status'),
+                "score": score,
+                "matched": self._matched_fields(key, terms)
+            })
+        return {"query": query, "total": sum(map(len, partition.values())), "results": results}
+
+
+search_index = ContainerSearchIndex()
@@ -0,0 +1,163 @@
+import heapq
+import itertools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import gevent
+from gevent.queue import Queue, Empty
+
+from .get_data import get_stack_name
+from .log_hub import LogStreamRegistry, log_stream_registry
+from .logs_manager import LogLine
+
+logger = logging.getLogger(__name__)
+
+
+class StackLogSource(NamedTuple):
+    server_name: str
+    server_url: str
+    name: str
+    is_swarm: bool
+
+    @property
+    def label(self) -> str:
+        return f"{self.server_name}/{self.name}"
+
+
+def find_host_stack_sources(server: Dict, stack: str) -> List[StackLogSource]:
+    client = server['client']
+    info = client.info()
+    is_swarm = info.get('Swarm', {}).get('LocalNodeState', '').lower() == 'active'
+
+    if is_swarm:
+        services = client.api.services(filters={'label': f'com.docker.stack.namespace={stack}'})
+        return [
+            StackLogSource(server['name'], server['url'], s['Spec']['Name'], True)
+            for s in services
+        ]
+
+    containers = client.api.containers(filters={'label': 'com.docker.compose.project'})
+    containers += client.api.containers(filters={'label': 'com.docker.stack.namespace'})
+    names = sorted({
+        c['Names'][0].lstrip('/')
+        for c in containers
+        if c.get('Names') and get_stack_name(c.get('Labels') or {}) == stack
+    })
+    return [StackLogSource(server['name'], server['url'], name, False) for name in names]
+
+
+def find_stack_sources(servers: List[Dict], stack: str, host_timeout: float = 10.0) -> List[StackLogSource]:
+    if not servers:
+        return []
+
+    sources = []
+    executor = ThreadPoolExecutor(max_workers=len(servers))
+    try:
+        future_to_server = {executor.submit(find_host_stack_sources, server, stack): server for server in servers}
+        # One deadline for all hosts; a hung host is left behind instead of holding the stream
+        _, not_done = wait(future_to_server, timeout=host_timeout)
+
+        for future, server in future_to_server.items():
+            if future in not_done:
+                logger.error(f"Timeout resolving stack {stack} on {server['name']} after {host_timeout}s")
+                continue
+            try:
+                sources.extend(future.result())
+            except Exception as e:
+                logger.error(f"Error resolving stack {stack} on {server['name']}: {e}")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return sources
+
+
+def _now_timestamp() -> Tuple[int, int]:
+    now_ns = time.time_ns()
+    return now_ns // 1_000_000_000, now_ns % 1_000_000_000
+
+
+class StackLogMerger:
+    """Follows every member of a stack and emits their lines in timestamp order.
+
+    Each line is held for ``reorder_window`` seconds after it arrives, so lines
+    that reach us slightly out of order from different hosts can still be sorted
+    in front of it. Batches are yielded as lists of ``(label, LogLine)`` pairs;
+    an empty list means the stream went idle for ``idle_interval`` seconds.
+    """
+
+    def __init__(self, sources: List[StackLogSource], tail: int = 50, reorder_window: float = 0.25,
+                 max_pending: int = 10000, idle_interval: float = 1.0,
+                 registry: Optional[LogStreamRegistry] = None):
+        self.sources = sources
+        self.tail = tail
+        self.reorder_window = reorder_window
+        self.max_pending = max_pending
+        self.idle_interval = idle_interval
+        self.registry = registry or log_stream_registry
+        self.errors: List[Dict] = []
+
+    def _forward(self, source: StackLogSource, subscription, queue: Queue):
+        try:
+            while True:
+                msg_type, data = subscription.get()
+                if msg_type == 'log':
+                    queue.put((source, data))
+                    continue
+                if msg_type == 'skipped':
+                    notice = f"[dockpeek] skipped {data} lines, the stream fell behind\n"
+                    queue.put((source, LogLine('stderr', None, notice.encode())))
+                    continue
+                if msg_type == 'error':
+                    self.errors.append({'source': source.label, 'error': data})
+                break
+        finally:
+            queue.put((source, None))
+
+    def __iter__(self) -> Iterator[List[Tuple[str, LogLine]]]:
+        # Bounded so a slow client backs up into each subscription's slow-consumer policy
+        queue = Queue(maxsize=1000)
+        subscriptions = []
+        forwarders = []
+        # The sequence number keeps the heap stable for identical timestamps
+        sequence = itertools.count()
+        pending = []
+
+        try:
+            for source in self.sources:
+                subscription = self.registry.subscribe(source.server_url, source.name, source.is_swarm, self.tail)
+                subscriptions.append(subscription)
+                forwarders.append(gevent.spawn(self._forward, source, subscription, queue))
+
+            active = len(forwarders)
+            while active or pending:
+                if pending:
+                    timeout = self.reorder_window - (time.monotonic() - pending[0][2])
+                else:
+                    timeout = self.idle_interval
+
+                idle = False
+                try:
+                    source, line = queue.get(timeout=max(timeout, 0))
+                    if line is None:
+                        active -= 1
+                    else:
+                        timestamp = line.timestamp or _now_timestamp()
+                        heapq.heappush(pending, (timestamp, next(sequence), time.monotonic(), source.label, line))
+                except Empty:
+                    idle = not pending
+
+                ready = []
+                now = time.monotonic()
+                while pending and (not active or len(pending) > self.max_pending
+                                   or now - pending[0][2] >= self.reorder_window):
+                    _, _, _, label, line = heapq.heappop(pending)
+                    ready.append((label, line))
+
+                if ready or idle:
+                    yield ready
+        finally:
+            for forwarder in forwarders:
+                forwarder.kill(block=False)
+            for subscription in subscriptions:
+                subscription.close()
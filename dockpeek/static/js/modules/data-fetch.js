@@ -24,6 +24,7 @@ export async function fetchContainerData() {
   }
 
   isFetching = true;
+  statusEtag = null;
 
   if (fetchController) {
     fetchController.abort();
@@ -34,7 +35,7 @@ export async function fetchContainerData() {
   showLoadingIndicator();
   loadFilterStates();
   try {
-    const response = await fetch(apiUrl("/data"), {
+    const response = await fetch(apiUrl("/data?format=columnar"), {
       signal: fetchController.signal
     });
     if (!response.ok) throw createResponseError(response);
@@ -43,7 +44,11 @@ export async function fetchContainerData() {
 
     state.allServersData.splice(0, state.allServersData.length, ...servers);
     setCachedServerStatus(servers);
-    state.allContainersData.splice(0, state.allContainersData.length, ...containers);
+    if (containers.format === 'columnar') {
+      decodeColumnarContainers(containers, state.allContainersData);
+    } else {
+      state.allContainersData.splice(0, state.allContainersData.length, ...containers);
+    }
 
     state.swarmServers = swarm_servers;
 
@@ -59,7 +64,7 @@ export async function fetchContainerData() {
     toggleClearButton();
     updateDisplay();
     updateSwarmIndicator(state.swarmServers, state.currentServerFilter);
-    startStatusRefresh();
+    startStatusEvents();
 
     // disable swarm update 
     const isCurrentServerSwarm = state.currentServerFilter !== 'all' &&
@@ -100,6 +105,59 @@ export async function fetchContainerData() {
 }
 
 
+// Decodes the /data?format=columnar container list (see dockpeek/columnar.py)
+// straight into `target`, building each row object once.
+export function decodeColumnarContainers(payload, target) {
+  const { rows, strings, columns } = payload;
+  target.length = rows;
+  for (let i = 0; i < rows; i++) {
+    target[i] = {};
+  }
+
+  for (const column of columns) {
+    const { key, values, fields } = column;
+    const missing = column.missing ? new Set(column.missing) : null;
+    const decode = columnDecoders[column.type] || columnDecoders.raw;
+    for (let i = 0; i < rows; i++) {
+      if (missing !== null && missing.has(i)) continue;
+      target[i][key] = decode(values[i], strings, fields);
+    }
+  }
+  return target;
+}
+
+const columnDecoders = {
+  raw: value => value,
+  string: (value, strings) => value === null ? null : strings[value],
+  strings: (value, strings) => value.map(index => strings[index]),
+  ports: (value, strings) => {
+    const ports = new Array(value.length / 4);
+    for (let j = 0, p = 0; j < value.length; j += 4, p++) {
+      const hostPort = strings[value[j + 1]];
+      const flags = value[j + 3];
+      ports[p] = {
+        container_port: strings[value[j]],
+        host_port: hostPort,
+        link: flags & 2 ? strings[value[j + 2]] + hostPort : strings[value[j + 2]],
+        is_custom: (flags & 1) === 1
+      };
+    }
+    return ports;
+  },
+  records: (value, strings, fields) => {
+    const records = [];
+    for (let j = 0; j < value.length; j += fields.length) {
+      const record = {};
+      for (let f = 0; f < fields.length; f++) {
+        const index = value[j + f];
+        record[fields[f]] = index === null ? null : strings[index];
+      }
+      records.push(record);
+    }
+    return records;
+  }
+};
+
 export function createResponseError(response) {
   const status = response.status;
   const messages = {
@@ -406,6 +464,7 @@ export async function installUpdate(serverName, containerName) {
   }
 }
 let statusRefreshController = null;
+let statusEtag = null;
 
 export async function refreshContainerStatus() {
   if (!state.isDataLoaded) return;
@@ -418,12 +477,17 @@ export async function refreshContainerStatus() {
 
   try {
     const response = await fetch(apiUrl("/status"), {
-      signal: statusRefreshController.signal
+      signal: statusRefreshController.signal,
+      cache: 'no-store',
+      headers: statusEtag ? { 'If-None-Match': statusEtag } : {}
     });
-    
+
+    // Nothing changed since the last refresh, so there is nothing to parse or redraw
+    if (response.status === 304) return;
     if (!response.ok) return;
 
     const { statuses = [] } = await response.json();
+    statusEtag = response.headers.get('ETag');
 
     if (statuses.length === 0) {
       console.warn("Status refresh returned empty - skipping update");
@@ -486,4 +550,93 @@ export function stopStatusRefresh() {
     clearInterval(statusRefreshInterval);
     statusRefreshInterval = null;
   }
-}
\ No newline at end of file
+}
+
+let statusEvents = null;
+let statusEventsOpened = false;
+
+// Status changes are pushed over /events; the periodic refresh only runs while
+// the event stream is down or when swarm hosts are shown, whose task states are not pushed.
+export function startStatusEvents() {
+  if (typeof EventSource === 'undefined') {
+    startStatusRefresh();
+    return;
+  }
+  if (statusEvents) {
+    syncStatusRefresh();
+    return;
+  }
+
+  statusEvents = new EventSource(apiUrl('/events'));
+  statusEvents.addEventListener('open', () => {
+    // Changes missed while disconnected cost one conditional /status request
+    if (statusEventsOpened) refreshContainerStatus();
+    statusEventsOpened = true;
+    syncStatusRefresh();
+  });
+  statusEvents.addEventListener('error', () => {
+    if (statusEvents.readyState === EventSource.CLOSED) {
+      statusEvents = null;
+      statusEventsOpened = false;
+    }
+    startStatusRefresh();
+  });
+  statusEvents.addEventListener('status', event => applyStatusChanges(JSON.parse(event.data).changes));
+  statusEvents.addEventListener('removed', event => removeContainers(JSON.parse(event.data).containers));
+  statusEvents.addEventListener('inventory', () => fetchContainerData());
+  statusEvents.addEventListener('resync', () => refreshContainerStatus());
+}
+
+export function stopStatusEvents() {
+  if (statusEvents) {
+    statusEvents.close();
+    statusEvents = null;
+    statusEventsOpened = false;
+  }
+}
+
+function syncStatusRefresh() {
+  if (statusEvents && statusEvents.readyState === EventSource.OPEN && state.swarmServers.length === 0) {
+    stopStatusRefresh();
+  } else {
+    startStatusRefresh();
+  }
+}
+
+function applyStatusChanges(changes) {
+  if (!state.isDataLoaded) return;
+  // Local state no longer matches the snapshot behind the last /status ETag
+  statusEtag = null;
+
+  for (const change of changes) {
+    const existing = state.allContainersData.find(
+      c => c.server === change.server && c.name === change.name
+    );
+    if (!existing) {
+      fetchContainerData();
+      return;
+    }
+    existing.status = change.status;
+    existing.exit_code = change.exit_code;
+    existing.started_at = change.started_at;
+  }
+
+  updateDisplay();
+  updateUpdatesLabel();
+}
+
+function removeContainers(containers) {
+  if (!state.isDataLoaded) return;
+  statusEtag = null;
+
+  const removed = new Set(containers.map(c => `${c.server}:${c.name}`));
+  for (let i = state.allContainersData.length - 1; i >= 0; i--) {
+    const container = state.allContainersData[i];
+    if (removed.has(`${container.server}:${container.name}`)) {
+      state.allContainersData.splice(i, 1);
+    }
+  }
+
+  updateDisplay();
+  updateUpdatesLabel();
+}
@@ -19,6 +19,8 @@ export class LogsViewer {
     this.currentContainerIndex = -1;
     this.fetchController = null;
     this.streamController = null;
+    this.olderLogsCursor = null;
+    this.isLoadingOlder = false;
     this.initModal();
   }
 
@@ -92,6 +94,9 @@ export class LogsViewer {
                 <option value="10000">Last 10 000 lines</option>
                 <option value="all">All logs</option>
               </select>
+              
+              <input type="text" id="logs-filter-input" class="logs-select logs-filter-input"
+                     placeholder="level>=warn trace_id=…" data-tooltip="Field filter for live streaming (JSON and logfmt logs)">
             </div>
             
             <div class="logs-controls-right">
@@ -230,6 +235,19 @@ export class LogsViewer {
     const tailSelect = document.getElementById('logs-tail-select');
     tailSelect.addEventListener('change', () => this.refresh());
 
+    const filterInput = document.getElementById('logs-filter-input');
+    filterInput.addEventListener('change', () => {
+      if (this.isStreaming) {
+        this.startStreaming();
+      }
+    });
+
+    this.logsContent.addEventListener('scroll', () => {
+      if (this.logsContent.scrollTop < 50 && !this.isStreaming) {
+        this.loadOlderLogs();
+      }
+    });
+
     const searchInput = document.getElementById('logs-search-input');
     searchInput.addEventListener('input', (e) => this.handleSearch(e.target.value));
     searchInput.addEventListener('keydown', (e) => {
@@ -403,6 +421,7 @@ export class LogsViewer {
 
     this.currentServer = null;
     this.currentContainer = null;
+    this.olderLogsCursor = null;
     this.searchMatches = [];
     this.currentMatchIndex = -1;
   }
@@ -422,15 +441,16 @@ export class LogsViewer {
   async fetchLogs() {
     const tailSelect = document.getElementById('logs-tail-select');
     const tail = tailSelect.value === 'all' ? 10000 : parseInt(tailSelect.value);
+    this.olderLogsCursor = null;
 
     try {
-      const response = await fetch(apiUrl('/get-container-logs'), {
+      const response = await fetch(apiUrl('/get-container-logs-page'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
           server_name: this.currentServer,
           container_name: this.currentContainer,
-          tail: tail,
+          page_size: tail,
           is_swarm: this.isSwarm || false
         }),
         signal: this.fetchController.signal
@@ -442,6 +462,7 @@ export class LogsViewer {
         this.displayLogs(data.logs);
         this.updateLineCount(data.lines);
         this.updateStatus('Logs loaded');
+        this.olderLogsCursor = data.has_more ? data.cursor : null;
       } else {
         this.displayError(data.error);
       }
@@ -454,6 +475,58 @@ export class LogsViewer {
     }
   }
 
+  async loadOlderLogs() {
+    if (!this.olderLogsCursor || this.isLoadingOlder) return;
+
+    const pre = this.logsContent.querySelector('.logs-pre');
+    if (!pre) return;
+
+    this.isLoadingOlder = true;
+    this.updateStatus('Loading older logs...');
+
+    const server = this.currentServer;
+    const container = this.currentContainer;
+
+    try {
+      const response = await fetch(apiUrl('/get-container-logs-page'), {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          server_name: server,
+          container_name: container,
+          page_size: 500,
+          cursor: this.olderLogsCursor,
+          direction: 'backward',
+          is_swarm: this.isSwarm || false
+        }),
+        signal: this.fetchController?.signal
+      });
+
+      const data = await response.json();
+      if (server !== this.currentServer || container !== this.currentContainer) return;
+
+      if (data.success) {
+        const previousHeight = this.logsContent.scrollHeight;
+        const logsHTML = data.logs.split('\n').map(line => this.formatLogLine(line)).join('');
+        pre.insertAdjacentHTML('afterbegin', logsHTML);
+        this.logsContent.scrollTop += this.logsContent.scrollHeight - previousHeight;
+
+        this.olderLogsCursor = data.has_more ? data.cursor : null;
+        this.updateLineCount(pre.querySelectorAll('.log-line').length);
+        this.updateStatus(data.has_more ? 'Logs loaded' : 'Beginning of logs');
+      } else {
+        this.olderLogsCursor = null;
+        this.updateStatus(`Failed to load older logs: ${data.error}`);
+      }
+    } catch (error) {
+      if (error.name !== 'AbortError') {
+        this.updateStatus(`Failed to load older logs: ${error.message}`);
+      }
+    } finally {
+      this.isLoadingOlder = false;
+    }
+  }
+
   displayLogs(logsText) {
     const lines = logsText.split('\n');
     const logsHTML = lines.map(line => this.formatLogLine(line)).join('');
@@ -468,9 +541,11 @@ export class LogsViewer {
     }
   }
 
-  formatLogLine(line) {
+  formatLogLine(line, isStderr = false) {
     if (!line.trim()) return '';
 
+    const lineClass = isStderr ? 'log-line log-stderr' : 'log-line';
+
     let taskPrefix = '';
     let timestampPart = '';
     let contentPart = line;
@@ -500,9 +575,9 @@ export class LogsViewer {
     const colorizedContent = this.colorizeLogLine(contentPart);
 
     if (timestampPart) {
-      return `<div class="log-line"><span class="log-timestamp">${timestampPart}</span> ${taskPrefix}${colorizedContent}</div>`;
+      return `<div class="${lineClass}"><span class="log-timestamp">${timestampPart}</span> ${taskPrefix}${colorizedContent}</div>`;
     } else {
-      return `<div class="log-line">${taskPrefix}${colorizedContent}</div>`;
+      return `<div class="${lineClass}">${taskPrefix}${colorizedContent}</div>`;
     }
   }
 
@@ -593,6 +668,7 @@ export class LogsViewer {
   async startStreaming() {
     this.stopStreaming();
     this.clearLogs();
+    this.olderLogsCursor = null;
 
     const tailSelect = document.getElementById('logs-tail-select');
     const tail = Math.min(parseInt(tailSelect.value) || 100, 100);
@@ -604,13 +680,14 @@ export class LogsViewer {
     let isFirstConnect = true;
     let connectionStartTime = null;
     let currentReader = null;
+    let resumeCursor = null;
 
     const connect = async () => {
       try {
         connectionStartTime = Date.now();
 
-        const currentLineCount = this.logsContent.querySelectorAll('.log-line').length;
-        const reconnectTail = Math.max(1, currentLineCount);
+        // Resume right after the last line received instead of downloading the pane again
+        const resume = isFirstConnect ? null : resumeCursor;
 
         const response = await fetch(apiUrl('/stream-container-logs'), {
           method: 'POST',
@@ -618,19 +695,30 @@ export class LogsViewer {
           body: JSON.stringify({
             server_name: this.currentServer,
             container_name: this.currentContainer,
-            tail: isFirstConnect ? tail : reconnectTail,
-            is_swarm: this.isSwarm || false
+            tail: tail,
+            resume: resume,
+            filter: document.getElementById('logs-filter-input').value.trim() || null,
+            is_swarm: this.isSwarm || false,
+            framing: 'batch',
+            compress: true
           }),
           signal: this.streamController.signal
         });
 
+        if (response.status === 400) {
+          const data = await response.json();
+          this.stopStreaming();
+          this.updateStatus(data.error || 'Invalid stream request');
+          return;
+        }
+
         if (!response.ok) {
           throw new Error(`HTTP error! status: ${response.status}`);
         }
 
         this.updateStatus('Streaming live...');
 
-        if (!isFirstConnect) {
+        if (!isFirstConnect && !resume) {
           this.logsContent.innerHTML = '<pre class="logs-pre"></pre>';
         }
 
@@ -658,29 +746,53 @@ export class LogsViewer {
           const lines = buffer.split('\n');
           buffer = lines.pop();
 
+          const framing = response.headers.get('X-Log-Framing') || 'line';
+          const received = [];
+
           for (const line of lines) {
-            if (line.trim()) {
-              try {
-                const data = JSON.parse(line);
-
-                if (data.heartbeat) {
-                  continue;
-                }
-
-                if (data.error) {
-                  console.error('Stream error:', data.error);
-                  this.stopStreaming();
-                  return;
-                }
-
-                if (data.line) {
-                  this.appendLogLine(data.line);
-                }
-              } catch (e) {
-                console.error('Failed to parse line:', line, e);
+            if (!line.trim()) continue;
+
+            if (framing === 'raw' && !line.startsWith('\x1e')) {
+              received.push({ text: line, stderr: false });
+              continue;
+            }
+
+            try {
+              const data = JSON.parse(framing === 'raw' ? line.slice(1) : line);
+
+              if (data.cursor) {
+                resumeCursor = data.cursor;
               }
+
+              if (data.heartbeat) {
+                continue;
+              }
+
+              if (data.skipped) {
+                received.push({ text: `[dockpeek] skipped ${data.skipped} lines, the stream fell behind`, stderr: true });
+                continue;
+              }
+
+              if (data.error) {
+                console.error('Stream error:', data.error);
+                received.push({ text: `Error: ${data.error}`, stderr: true });
+                this.appendLogLines(received);
+                this.stopStreaming();
+                return;
+              }
+
+              if (data.lines) {
+                const stderr = new Set(data.stderr || []);
+                data.lines.forEach((text, i) => received.push({ text, stderr: stderr.has(i) }));
+              } else if (data.line) {
+                received.push({ text: data.line, stderr: data.stream === 'stderr' });
+              }
+            } catch (e) {
+              console.error('Failed to parse line:', line, e);
             }
           }
+
+          this.appendLogLines(received);
         }
 
         try {
@@ -741,6 +853,12 @@ export class LogsViewer {
   }
 
   appendLogLine(line) {
+    this.appendLogLines([{ text: line, stderr: false }]);
+  }
+
+  appendLogLines(newLines) {
+    if (newLines.length === 0) return;
+
     let pre = this.logsContent.querySelector('.logs-pre');
 
 
@@ -752,22 +870,22 @@ export class LogsViewer {
     }
 
     if (pre) {
-
-      const cleanLine = line.replace(/\n$/, '');
-      const formattedLine = this.formatLogLine(cleanLine);
-      pre.insertAdjacentHTML('beforeend', formattedLine);
-
+      const formattedLines = newLines
+        .map(line => this.formatLogLine(line.text.replace(/\n$/, ''), line.stderr))
+        .join('');
+      pre.insertAdjacentHTML('beforeend', formattedLines);
 
       const lines = pre.querySelectorAll('.log-line');
-      if (lines.length > 5000) {
-        lines[0].remove();
+      const overflow = lines.length - 5000;
+      for (let i = 0; i < overflow; i++) {
+        lines[i].remove();
       }
 
       if (this.autoScroll) {
         this.scrollToBottom();
       }
 
-      this.updateLineCount(lines.length);
+      this.updateLineCount(Math.min(lines.length, 5000));
     }
   }
 
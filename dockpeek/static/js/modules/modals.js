@@ -385,6 +385,26 @@ export function showPruneResultModal(data) {
   }
 
   messageEl.innerHTML = message;
+
+  if (data.errors && data.errors.length > 0) {
+    // Error text comes from the Docker daemon, so it is inserted as text rather than markup
+    const wrapper = document.createElement('div');
+    wrapper.className = 'text-sm text-left';
+    const list = document.createElement('ul');
+    list.className = 'mt-2 space-y-1 prune-details-list';
+    data.errors.forEach(err => {
+      const li = document.createElement('li');
+      const serverEl = document.createElement('strong');
+      serverEl.textContent = `${err.server}:`;
+      const errorEl = document.createElement('span');
+      errorEl.className = 'text-red-500';
+      errorEl.textContent = `failed (${err.error})`;
+      li.append('• ', serverEl, ' ', errorEl);
+      list.appendChild(li);
+    });
+    wrapper.appendChild(list);
+    messageEl.appendChild(wrapper);
+  }
   modal.classList.remove('hidden');
 
   const okHandler = () => {
@@ -88,7 +88,7 @@ export async function handlePruneImages() {
 
     try {
       await showPruneInfoModal(data);
-      await performPrune();
+      await performPrune(data.plan_id);
     } catch (err) {
       console.log('Prune cancelled');
     }
@@ -101,17 +101,25 @@ export async function handlePruneImages() {
   }
 }
 
-async function performPrune() {
+async function performPrune(planId) {
   try {
     const response = await fetch(apiUrl('/prune-images'), {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ server_name: state.currentServerFilter })
+      body: JSON.stringify({ server_name: state.currentServerFilter, plan_id: planId })
     });
 
+    if (response.status === 410) {
+      state.pruneInfoCache = null;
+      alert('The reviewed image list has expired. Please open prune again to review the current images.');
+      return;
+    }
+
     if (!response.ok) throw new Error('Failed to prune images');
 
-    const data = await response.json();
+    const data = await readPruneStream(response);
+    if (!data) throw new Error('Prune stream ended without a summary');
+
     showPruneResultModal(data);
     state.pruneInfoCache = null;
     updatePruneBadge(0);
@@ -121,6 +129,41 @@ async function performPrune() {
   }
 }
 
+async function readPruneStream(response) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let summary = null;
+  let removed = 0;
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop();
+
+    for (const line of lines) {
+      if (!line.trim()) continue;
+
+      const event = JSON.parse(line);
+      if (event.type === 'image') {
+        if (event.removed) {
+          removed++;
+          updatePruneBadge(Math.max(0, (state.pruneInfoCache?.total_count || 0) - removed));
+        }
+      } else if (event.type === 'server' && event.error) {
+        console.error(`Prune failed on ${event.server}:`, event.error);
+      } else if (event.type === 'summary') {
+        summary = event;
+      }
+    }
+  }
+
+  return summary;
+}
+
 export function updatePruneBadge(count) {
   const badge = document.getElementById('prune-badge');
   if (count > 0) {
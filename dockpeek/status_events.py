@@ -0,0 +1,185 @@
+"""Push channel for container status changes, served as Server-Sent Events on /events.
+
+While at least one client is connected, each worker follows the Docker event
+stream of every active standalone host in one greenlet per host. Events for
+the same container within a short window are coalesced, the container is
+inspected once, and a single batch of patches is fanned out to every client.
+An idle client costs only its bounded queue, so thousands of them share the
+same upstream streams.
+"""
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import gevent
+from gevent.lock import RLock
+from gevent.queue import Full, Queue
+
+from .container_details import container_detail_cache
+from .docker_utils import DockerClientFactory, create_streaming_client, get_container_status_with_exit_code
+
+logger = logging.getLogger(__name__)
+
+WATCHED_ACTIONS = ('create', 'start', 'restart', 'die', 'stop', 'pause', 'unpause', 'destroy', 'rename', 'health_status')
+# Changes the /data row needs more than a status patch for
+INVENTORY_ACTIONS = ('create', 'rename')
+
+RETRY_SECONDS = 5
+
+
+class StatusEventSubscription:
+    def __init__(self, hub: 'StatusEventHub', max_queued: int = 256):
+        self.hub = hub
+        self._queue = Queue(maxsize=max_queued)
+        self._overflowed = False
+
+    def put(self, event: Tuple[str, Dict]):
+        try:
+            self._queue.put_nowait(event)
+        except Full:
+            # Patches are only useful in order, so a consumer this far behind resyncs instead
+            self._overflowed = True
+
+    def get(self, timeout: Optional[float] = None) -> Tuple[str, Dict]:
+        if self._overflowed:
+            self._overflowed = False
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            return 'resync', {}
+        return self._queue.get(timeout=timeout)
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class StatusEventHub:
+    def __init__(self, debounce: float = 0.25):
+        self.debounce = debounce
+        self._subscribers = set()
+        self._watchers: Dict[str, gevent.Greenlet] = {}
+        self._pending: Dict[str, Dict[str, Tuple[str, str]]] = {}
+        self._flushers: Dict[str, gevent.Greenlet] = {}
+        self._lock = RLock()
+
+    def subscribe(self, servers: List[Dict]) -> StatusEventSubscription:
+        subscription = StatusEventSubscription(self)
+        with self._lock:
+            self._subscribers.add(subscription)
+            for server in servers:
+                if server['status'] != 'active' or server['name'] in self._watchers:
+                    continue
+                self._watchers[server['name']] = gevent.spawn(self._watch, server['name'], server['url'])
+        return subscription
+
+    def unsubscribe(self, subscription: StatusEventSubscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+            if self._subscribers:
+                return
+            greenlets = list(self._watchers.values()) + list(self._flushers.values())
+            self._watchers.clear()
+            self._flushers.clear()
+            self._pending.clear()
+
+        current = gevent.getcurrent()
+        for greenlet in greenlets:
+            if greenlet is not current:
+                greenlet.kill(block=False)
+
+    def _broadcast(self, event: Tuple[str, Dict]):
+        for subscription in list(self._subscribers):
+            subscription.put(event)
+
+    def _watch(self, server_name: str, server_url: str):
+        since = None
+        watching = True
+        inspect_client = DockerClientFactory().create_client(server_url)
+        try:
+            while True:
+                started = time.time()
+                client = None
+                try:
+                    client = create_streaming_client(server_url)
+                    if client.info().get('Swarm', {}).get('LocalNodeState', '').lower() == 'active':
+                        # Task state changes are not engine events, swarm hosts stay on /status polling.
+                        # The finished greenlet stays registered so later subscribers do not ask again.
+                        watching = False
+                        return
+                    for event in client.events(decode=True, since=since, filters={'type': 'container'}):
+                        since = event.get('time', since)
+                        self._queue_change(server_name, inspect_client, event)
+                except gevent.GreenletExit:
+                    raise
+                except Exception as e:
+                    logger.debug(f"Docker event stream for {server_name} ended: {e}")
+                finally:
+                    if client is not None:
+                        client.close()
+
+                # Idle streams end at the client read timeout and reconnect from `since` at once
+                if time.time() - started < RETRY_SECONDS:
+                    gevent.sleep(RETRY_SECONDS)
+        finally:
+            inspect_client.close()
+            with self._lock:
+                if watching and self._watchers.get(server_name) is gevent.getcurrent():
+                    del self._watchers[server_name]
+
+    def _queue_change(self, server_name: str, client, event: Dict):
+        action = event.get('Action', '').split(':', 1)[0]
+        if action not in WATCHED_ACTIONS:
+            return
+        container_id = event.get('id') or event.get('Actor', {}).get('ID')
+        name = event.get('Actor', {}).get('Attributes', {}).get('name', '')
+        if not container_id:
+            return
+        container_detail_cache.invalidate(server_name, container_id, name)
+
+        with self._lock:
+            pending = self._pending.setdefault(server_name, {})
+            _, previous_action = pending.get(container_id, (None, None))
+            if previous_action not in INVENTORY_ACTIONS or action == 'destroy':
+                pending[container_id] = (name, action)
+            if server_name not in self._flushers:
+                self._flushers[server_name] = gevent.spawn_later(self.debounce, self._flush, server_name, client)
+
+    def _flush(self, server_name: str, client):
+        with self._lock:
+            pending = self._pending.pop(server_name, {})
+            self._flushers.pop(server_name, None)
+
+        statuses, removed, inventory_changed = [], [], False
+        for container_id, (name, action) in pending.items():
+            if action == 'destroy':
+                removed.append({'server': server_name, 'name': name})
+                continue
+            if action in INVENTORY_ACTIONS:
+                inventory_changed = True
+                continue
+            try:
+                container = client.containers.get(container_id)
+                status, exit_code = get_container_status_with_exit_code(container)
+                statuses.append({
+                    'server': server_name,
+                    'name': container.name,
+                    'status': status,
+                    'exit_code': exit_code,
+                    'started_at': container.attrs.get('State', {}).get('StartedAt', '')
+                })
+            except Exception as e:
+                logger.debug(f"Could not inspect {name} on {server_name}: {e}")
+                inventory_changed = True
+
+        if statuses:
+            self._broadcast(('status', {'changes': statuses}))
+        if removed:
+            self._broadcast(('removed', {'containers': removed}))
+        if inventory_changed:
+            self._broadcast(('inventory', {'server': server_name}))
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {"subscribers": len(self._subscribers), "watched_servers": sorted(self._watchers)}
+
+
+status_event_hub = StatusEventHub()